@@ -0,0 +1,26 @@
+"""Add post (created_at, id) index
+
+Revision ID: 3b9f4a1c2d7e
+Revises: c6d0e2fdd867
+Create Date: 2026-10-18 18:20:41.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9f4a1c2d7e'
+down_revision: Union[str, None] = 'c6d0e2fdd867'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_post_created_at_id', 'post', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_created_at_id', table_name='post', if_exists=True)
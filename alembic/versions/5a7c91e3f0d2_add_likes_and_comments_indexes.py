@@ -0,0 +1,87 @@
+"""Add likes and comments indexes
+
+Revision ID: 5a7c91e3f0d2
+Revises: 8e2a5d4f6b10
+Create Date: 2026-10-18 18:44:53.210376
+
+Indexes are built with CREATE INDEX CONCURRENTLY on Postgres so the tables stay
+writable while they build. CONCURRENTLY cannot run inside a transaction, hence the
+autocommit block. A failed concurrent build leaves an INVALID index behind; the
+upgrade checks for that and fails, rerunning it removes any new duplicates and drops
+and rebuilds the index.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7c91e3f0d2'
+down_revision: Union[str, None] = '8e2a5d4f6b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+indexes = (
+    ('uq_likes_post_id_user_id', 'likes', ['post_id', 'user_id'], True),
+    ('ix_likes_user_id', 'likes', ['user_id'], False),
+    ('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'], False),
+    ('ix_comments_user_id', 'comments', ['user_id'], False),
+)
+
+
+def assert_index_valid(name: str):
+    """CREATE INDEX CONCURRENTLY leaves the index behind, marked INVALID, when it fails,
+    for a unique index typically because duplicates were written during the build."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    valid = bind.execute(
+        sa.text('SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)'),
+        {'name': name},
+    ).scalar()
+    if not valid:
+        raise RuntimeError(
+            f'Index {name} is missing or INVALID after a concurrent build. Duplicate likes were '
+            f'probably written while it was building; rerun the upgrade to remove them and rebuild it.'
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Duplicate likes would fail the unique index, keep the oldest of each (post, user) pair
+    # and recount the posts that had any
+    post_ids = bind.execute(sa.text(
+        'SELECT DISTINCT post_id FROM likes GROUP BY post_id, user_id HAVING count(*) > 1'
+    )).scalars().all()
+    op.execute(
+        'DELETE FROM likes WHERE id NOT IN ('
+        'SELECT min(id) FROM likes GROUP BY post_id, user_id)'
+    )
+    if post_ids:
+        bind.execute(
+            sa.text(
+                'UPDATE post SET like_count = (SELECT count(*) FROM likes WHERE likes.post_id = post.id) '
+                'WHERE id IN :post_ids'
+            ).bindparams(sa.bindparam('post_ids', expanding=True)),
+            {'post_ids': post_ids},
+        )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in indexes:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+            try:
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+            except sa.exc.IntegrityError as e:
+                raise RuntimeError(
+                    f'Building {name} failed on duplicate rows written during the migration; '
+                    f'rerun the upgrade to remove them and rebuild it.'
+                ) from e
+            assert_index_valid(name)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(indexes):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""Add post like_count and comment_count counters
+
+Revision ID: 8e2a5d4f6b10
+Revises: 3b9f4a1c2d7e
+Create Date: 2026-10-18 18:31:07.554920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2a5d4f6b10'
+down_revision: Union[str, None] = '3b9f4a1c2d7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('post', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('post', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE post SET '
+        'like_count = (SELECT count(*) FROM likes WHERE likes.post_id = post.id), '
+        'comment_count = (SELECT count(*) FROM comments WHERE comments.post_id = post.id)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('post', 'comment_count')
+    op.drop_column('post', 'like_count')
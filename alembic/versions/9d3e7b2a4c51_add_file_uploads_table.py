@@ -0,0 +1,43 @@
+"""Add file_uploads table
+
+Revision ID: 9d3e7b2a4c51
+Revises: 5a7c91e3f0d2
+Create Date: 2026-10-18 19:12:38.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3e7b2a4c51'
+down_revision: Union[str, None] = '5a7c91e3f0d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'file_uploads',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('file_name', sa.String(), nullable=False),
+        sa.Column('content_type', sa.String(), nullable=False),
+        sa.Column('max_size', sa.BigInteger(), nullable=False),
+        sa.Column('upload_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), server_default='pending', nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('key'),
+    )
+    op.create_index(op.f('ix_file_uploads_id'), 'file_uploads', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_file_uploads_id'), table_name='file_uploads')
+    op.drop_table('file_uploads')
@@ -0,0 +1,26 @@
+"""Add user (created_at, id) index
+
+Revision ID: c6d0e2fdd867
+Revises: f80feff8965a
+Create Date: 2026-10-18 18:05:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d0e2fdd867'
+down_revision: Union[str, None] = 'f80feff8965a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_created_at_id', 'user', ['created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_created_at_id', table_name='user', if_exists=True)
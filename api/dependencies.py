@@ -1,6 +1,4 @@
-from http.client import HTTPException
-
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from typing import Annotated, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.http.http_client import get_http_client, HttpClient
@@ -14,13 +12,25 @@ from db.database import \
 from services.AI.chat_bot import get_chat_completion_service
 from services.AI.interfaces import OpenAIInterface
 from db.crud.user import UserRepository
+from db.crud.post import PostRepository
+from db.counter_buffer import get_like_counter_buffer
+from db.crud.cached_repository import CachedRepository
+from services.cache.cache import get_user_cache
 from db.interfaces import DataBaseRepositoryInterface
 from services.AI.interfaces import OpenAIInterface
 from services.AI.chat_bot import ChatCompletion
+from services.AI.admission_controller import get_admission_controller
+from services.AI.cached_chat_completion import \
+    CachedChatCompletion,\
+    get_chat_completion_cache,\
+    get_chat_completion_single_flight
+from core.config import settings
 from core.logger import get_logger
 
 # AWS
 from services.aws.s3_client import get_aws_s3_client, AWSClientS3Interface
+from services.aws.direct_upload import DirectUploadService
+from db.crud.file_upload import FileUploadRepository
 
 logger = get_logger(__name__)
 
@@ -34,13 +44,16 @@ aws_s3_client_dep = Annotated[AWSClientS3Interface, Depends(get_aws_s3_client)]
 # AI Dependencies
 def get_chat_completion_service(http_client: http_client_dep) -> AsyncGenerator[OpenAIInterface, None]:
     try:
-        chat_completion = ChatCompletion(
-            http_client=http_client,
+        chat_completion = CachedChatCompletion(
+            ChatCompletion(http_client=http_client, admission_controller=get_admission_controller()),
+            cache=get_chat_completion_cache(),
+            single_flight=get_chat_completion_single_flight(),
         )
-        yield chat_completion
     except Exception as e:
         logger.error(str(e))
         raise HTTPException(status_code=500, detail=f"Failed to initialize AI service. {str(e)}")
+    # Yielded outside the try so request errors are not reported as initialization failures
+    yield chat_completion
 
 
 chat_completion_dep = Annotated[OpenAIInterface, Depends(get_chat_completion_service)]
@@ -56,7 +69,27 @@ database_session_dep = Annotated[AsyncSession, Depends(get_database_session)]
 
 
 async def get_user_repository(db_session: database_session_dep) -> AsyncGenerator[DataBaseRepositoryInterface, None]:
-    user_repository = UserRepository(db_session)
+    user_repository = CachedRepository(UserRepository(db_session), get_user_cache(), namespace="user")
     yield user_repository
 
 user_repository_dep = Annotated[DataBaseRepositoryInterface, Depends(get_user_repository)]
+
+
+def build_post_repository(db_session: AsyncSession) -> PostRepository:
+    counter_buffer = get_like_counter_buffer() if settings.LIKE_COUNTER_WRITE_BEHIND else None
+    return PostRepository(db_session, counter_buffer=counter_buffer)
+
+
+async def get_post_repository(db_session: database_session_dep) -> AsyncGenerator[DataBaseRepositoryInterface, None]:
+    post_repository = build_post_repository(db_session)
+    yield post_repository
+
+post_repository_dep = Annotated[DataBaseRepositoryInterface, Depends(get_post_repository)]
+
+
+async def get_direct_upload_service(
+        db_session: database_session_dep, s3_client: aws_s3_client_dep
+) -> AsyncGenerator[DirectUploadService, None]:
+    yield DirectUploadService(s3_client, FileUploadRepository(db_session))
+
+direct_upload_service_dep = Annotated[DirectUploadService, Depends(get_direct_upload_service)]
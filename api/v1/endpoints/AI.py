@@ -1,17 +1,109 @@
-from fastapi import APIRouter
+import json
+import time
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from httpx import HTTPError
 from openai.types.chat import ChatCompletionMessage
-from schemas.AI import ChatCompletionRequest
+from schemas.AI import ChatCompletionRequest, ChatCompletionBatchRequest
+from core.config import settings
 from core.logger import get_logger
 from api.dependencies import chat_completion_dep
+from services.AI.interfaces import OpenAIInterface
+from services.AI.cached_chat_completion import get_chat_completion_cache, get_chat_completion_single_flight
+from services.AI.admission_controller import get_admission_controller
+from services.AI.batch_chat_completion import complete_batch
 
 logger = get_logger(__name__)
 router = APIRouter()
 
 
+def server_sent_event(data: dict, event: str = "message") -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def chat_completion_events(
+        request: Request,
+        deltas: AsyncIterator[str],
+        first_content: Optional[str],
+        start_time: float,
+) -> AsyncIterator[str]:
+    """Re-emits the upstream deltas as Server-Sent Events. Leaving the loop closes the
+    upstream stream, so a client disconnect also cancels the OpenAI request."""
+    time_to_first_token = None if first_content is None else time.monotonic() - start_time
+    try:
+        if first_content is not None:
+            yield server_sent_event({"content": first_content})
+        async for content in deltas:
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling chat completion stream")
+                return
+            yield server_sent_event({"content": content})
+    except HTTPError as e:
+        logger.error(f"Error streaming chat completion: {str(e)}")
+        yield server_sent_event({"detail": f"There was an error generating message: {str(e)}"}, event="error")
+        return
+    finally:
+        await deltas.aclose()
+
+    yield server_sent_event({
+        "time_to_first_token": time_to_first_token,
+        "total_time": time.monotonic() - start_time,
+    }, event="done")
+
+
 # @router.post("/chat-completion", status_code=200, response_model=ChatCompletionMessage)
 # async def chat_completion(body: ChatCompletionRequest, http_client: http_client_dep):
 #     return await get_chat_completion_http(http_client=http_client, prompt=body.prompt)
 
 @router.post("/chat-completion", status_code=200, response_model=ChatCompletionMessage)
-async def chat_completion(body: ChatCompletionRequest, chat_completion_client: chat_completion_dep):
-    return await chat_completion_client.get_model_response(prompt=body.prompt)
+async def chat_completion(body: ChatCompletionRequest, request: Request, chat_completion_client: chat_completion_dep):
+    if body.stream:
+        start_time = time.monotonic()
+        deltas = chat_completion_client.stream_model_response(body.prompt, max_tokens=body.max_tokens)
+        # Waiting for the first delta before answering lets admission rejections and
+        # upstream errors go out as a status code rather than as an error event
+        try:
+            first_content = await anext(deltas)
+        except StopAsyncIteration:
+            first_content = None
+
+        return StreamingResponse(
+            chat_completion_events(request, deltas, first_content, start_time),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return await chat_completion_client.get_model_response(prompt=body.prompt, max_tokens=body.max_tokens)
+
+
+@router.post("/chat-completion/batch", status_code=200)
+async def chat_completion_batch(body: ChatCompletionBatchRequest, chat_completion_client: chat_completion_dep):
+    max_concurrency = min(
+        body.max_concurrency or settings.CHAT_COMPLETION_BATCH_CONCURRENCY,
+        settings.CHAT_COMPLETION_BATCH_CONCURRENCY,
+    )
+    results = complete_batch(chat_completion_client, body.items, max_concurrency)
+
+    if body.stream:
+        async def ndjson_lines() -> AsyncIterator[str]:
+            try:
+                async for result in results:
+                    yield json.dumps(result) + "\n"
+            finally:
+                await results.aclose()
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    ordered = sorted([result async for result in results], key=lambda result: result["index"])
+    return {"results": ordered}
+
+
+@router.get("/chat-completion/cache/stats", status_code=200, response_model=Dict)
+async def chat_completion_cache_stats():
+    return {**get_chat_completion_cache().stats(), "single_flight": get_chat_completion_single_flight().stats()}
+
+
+@router.get("/chat-completion/admission/stats", status_code=200, response_model=Dict)
+async def chat_completion_admission_stats():
+    return get_admission_controller().stats()
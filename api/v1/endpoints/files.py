@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Header, Request, UploadFile, status
+from core.logger import get_logger
+from api.dependencies import aws_s3_client_dep, direct_upload_service_dep
+from services.aws.executor import get_upload_buffer_budget, get_upload_executor
+from services.aws.s3_client import get_presigned_url_cache
+from schemas.file_schema import CompleteUploadRequest, DirectUploadRequest, PresignRequest
+from typing import Dict, Optional
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def upload_file(file: UploadFile, s3_client: aws_s3_client_dep):
+    return {"url": await s3_client.upload_file_to_s3_bucket(file)}
+
+
+@router.put("/{file_name}", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def upload_file_stream(
+        file_name: str,
+        request: Request,
+        s3_client: aws_s3_client_dep,
+        content_type: Optional[str] = Header(default=None),
+):
+    """Raw request body upload. Unlike multipart/form-data, the body is never spooled to
+    a temporary file: it is forwarded to S3 part by part as it is received."""
+    return {"url": await s3_client.upload_stream_to_s3_bucket(request.stream(), file_name, content_type)}
+
+
+@router.post("/direct-uploads", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def create_direct_upload(request: DirectUploadRequest, direct_upload_service: direct_upload_service_dep):
+    """Returns a presigned POST, or presigned part URLs for large files, to upload the
+    file straight to S3. Call the complete endpoint once the upload has finished."""
+    return await direct_upload_service.create(request)
+
+
+@router.post("/direct-uploads/{upload_id}/complete", status_code=status.HTTP_200_OK, response_model=Dict)
+async def complete_direct_upload(
+        upload_id: int,
+        request: CompleteUploadRequest,
+        direct_upload_service: direct_upload_service_dep,
+):
+    return await direct_upload_service.complete(upload_id, request)
+
+
+@router.post("/presign", status_code=status.HTTP_200_OK, response_model=Dict)
+async def presign_files(request: PresignRequest, s3_client: aws_s3_client_dep):
+    return {"urls": await s3_client.get_signed_urls(request.file_names, expiration=request.expiration)}
+
+
+@router.get("/presign/stats", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_presign_stats():
+    stats = get_presigned_url_cache().stats()
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hit_rate": stats["hits"] / lookups if lookups else 0.0}
+
+
+@router.get("/{file_name}", status_code=status.HTTP_200_OK)
+async def download_file(
+        file_name: str,
+        s3_client: aws_s3_client_dep,
+        range_header: Optional[str] = Header(default=None, alias="Range"),
+        if_none_match: Optional[str] = Header(default=None),
+):
+    """Streams the object from S3. Answers 206 to Range requests and 304 when the
+    If-None-Match ETag still matches."""
+    return await s3_client.get_file_from_s3_bucket(file_name, range_header=range_header, if_none_match=if_none_match)
+
+
+@router.get("/upload/stats", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_upload_stats():
+    return {**get_upload_executor().stats(), "buffer": get_upload_buffer_budget().stats()}
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Header, Query, status
+from core.config import settings
+from core.logger import get_logger
+from api.dependencies import build_post_repository, post_repository_dep
+from db.crud.post import PostRepository
+from db.database import DatabaseSession, get_database_session_maker
+from db.counter_buffer import get_like_counter_buffer
+from services.cache.idempotency import get_idempotency_store
+from schemas.post_schema import CommentRequest, LikeRequest, PostRequest
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+async def run_idempotent(
+        idempotency_key: Optional[str],
+        scope: str,
+        post_repository: PostRepository,
+        fn: Callable[[PostRepository], Awaitable[Any]],
+) -> Any:
+    """Replays the stored response of a retried request. The key is scoped to the
+    operation so reusing it for a different request does not return a foreign response.
+
+    Keyed calls run detached from the request: concurrent retries share them and they
+    finish even if the caller goes away. They therefore open their own session instead
+    of borrowing the request's one, which is closed when the request ends."""
+    if idempotency_key is None:
+        return await fn(post_repository)
+
+    async def execute():
+        async with DatabaseSession(get_database_session_maker()) as session:
+            return await fn(build_post_repository(session))
+
+    return await get_idempotency_store().run(f"{scope}:{idempotency_key}", execute)
+
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_feed(
+        post_repository: post_repository_dep,
+        limit: int = Query(default=50, ge=1, le=100),
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = Query(default=None),
+        author_id: Optional[int] = None,
+):
+    filters = {"author_id": author_id}
+    return await post_repository.get_page(
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        **{field: value for field, value in filters.items() if value is not None}
+    )
+
+
+@router.get("/likes/stats", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_like_stats():
+    return {
+        "idempotency": get_idempotency_store().stats(),
+        "counter_buffer": get_like_counter_buffer().stats() if settings.LIKE_COUNTER_WRITE_BEHIND else None,
+    }
+
+
+@router.get("/{post_id}", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_post(post_id: int, post_repository: post_repository_dep):
+    return await post_repository.find_unique(id=post_id)
+
+
+@router.post("/create", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def create_post(post: PostRequest, post_repository: post_repository_dep):
+    logger.debug(f"post: {post.dict()}")
+    return await post_repository.create_one(post)
+
+
+@router.post("/{post_id}/comments", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def create_comment(post_id: int, comment: CommentRequest, post_repository: post_repository_dep):
+    return await post_repository.add_comment(post_id, comment)
+
+
+@router.post("/{post_id}/like", status_code=status.HTTP_200_OK, response_model=Dict)
+async def like_post(
+        post_id: int,
+        like: LikeRequest,
+        post_repository: post_repository_dep,
+        idempotency_key: Optional[str] = Header(default=None, max_length=255),
+):
+    return await run_idempotent(
+        idempotency_key,
+        f"like:{post_id}:{like.user_id}",
+        post_repository,
+        lambda repository: repository.like_post(post_id, like),
+    )
+
+
+@router.delete("/{post_id}/like", status_code=status.HTTP_200_OK, response_model=Dict)
+async def unlike_post(
+        post_id: int,
+        post_repository: post_repository_dep,
+        user_id: int = Query(),
+        idempotency_key: Optional[str] = Header(default=None, max_length=255),
+):
+    return await run_idempotent(
+        idempotency_key,
+        f"unlike:{post_id}:{user_id}",
+        post_repository,
+        lambda repository: repository.unlike_post(post_id, LikeRequest(user_id=user_id)),
+    )
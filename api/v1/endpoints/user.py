@@ -1,12 +1,98 @@
-from fastapi import APIRouter, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Body, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from core.config import settings
 from core.logger import get_logger
 from api.dependencies import user_repository_dep
+from db.crud.filters import validate_fields
+from db.crud.user import UserRepository
+from db.models import User
+from db.database import DatabaseSession, get_database_session_maker
+from services.cache.cache import get_user_cache
 from schemas.user_schema import UserRequest
-from typing import Dict
+from typing import Annotated, AsyncIterator, Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+import csv
+import io
+import json
 
 logger = get_logger(__name__)
 router = APIRouter()
+# All rows of a bulk create go into one transaction, ten insert chunks at most
+MAX_BULK_USERS = 10_000
+
+
+class ExportFormatEnum(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+def json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def csv_lines(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_users_rows(export_format: ExportFormatEnum, fields: List[str]) -> AsyncIterator[str]:
+    """Streams one serialised chunk per database batch. The session is opened here rather
+    than through a dependency because it has to outlive the endpoint while the body streams."""
+    async with DatabaseSession(get_database_session_maker()) as session:
+        if export_format == ExportFormatEnum.CSV:
+            yield csv_lines([fields])
+
+        async for batch in UserRepository(session).stream_all(fields, settings.DB_STREAM_BATCH_SIZE):
+            if export_format == ExportFormatEnum.CSV:
+                yield csv_lines([row[field] for field in fields] for row in batch)
+            else:
+                yield "".join(json.dumps(dict(row), default=json_default) + "\n" for row in batch)
+
+
+@router.get("", status_code=status.HTTP_200_OK, response_model=Dict)
+async def list_users(
+        user_repository: user_repository_dep,
+        limit: int = Query(default=50, ge=1, le=500),
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = Query(default=None),
+        username: Optional[str] = None,
+        email: Optional[str] = None,
+        is_confirmed: Optional[bool] = None,
+):
+    filters = {"username": username, "email": email, "is_confirmed": is_confirmed}
+    return await user_repository.get_page(
+        limit=limit,
+        cursor=cursor,
+        fields=fields,
+        **{field: value for field, value in filters.items() if value is not None}
+    )
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_users(
+        export_format: ExportFormatEnum = Query(default=ExportFormatEnum.NDJSON, alias="format"),
+        fields: Optional[List[str]] = Query(default=None),
+):
+    fields = validate_fields(User, fields)
+    media_type = "text/csv" if export_format == ExportFormatEnum.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        export_users_rows(export_format, fields),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=users.{export_format.value}"},
+    )
+
+
+@router.get("/cache/stats", status_code=status.HTTP_200_OK, response_model=Dict)
+async def get_user_cache_stats():
+    return get_user_cache().stats()
+
+
+@router.get("/reports/{query_name}", status_code=status.HTTP_200_OK, response_model=List[Dict])
+async def run_report(query_name: str, request: Request, user_repository: user_repository_dep):
+    """Runs a named query, its arguments are taken from the query string."""
+    return await user_repository.find_by_query(query_name, dict(request.query_params))
 
 
 @router.get("/{user_id}", status_code=status.HTTP_200_OK)
@@ -18,3 +104,12 @@ async def get_user(user_id: int, user_repository: user_repository_dep):
 async def create_user(user: UserRequest, user_repository: user_repository_dep):
     logger.debug(f"user: {user.dict()}")
     return await user_repository.create_one(user)
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=Dict)
+async def create_users(
+        users: Annotated[List[UserRequest], Body(min_length=1, max_length=MAX_BULK_USERS)],
+        user_repository: user_repository_dep,
+):
+    logger.debug(f"bulk creating {len(users)} users")
+    return await user_repository.create_many(users)
@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 from api.v1.endpoints import AI
 from api.v1.endpoints import user
+from api.v1.endpoints import post
+from api.v1.endpoints import files
 
 v1_router = APIRouter()
 
 v1_router.include_router(AI.router, prefix="/v1/ai", tags=["AI"])
 v1_router.include_router(user.router, prefix="/v1/user", tags=["user"])
+v1_router.include_router(post.router, prefix="/v1/posts", tags=["post"])
+v1_router.include_router(files.router, prefix="/v1/files", tags=["files"])
@@ -1,5 +1,5 @@
 import secrets
-from typing import Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import EmailStr
@@ -16,12 +16,62 @@ class Settings(BaseSettings):
     DATABASE_URL: Optional[str] = None
     ASYNC_DATABASE_URL: Optional[str] = None
     DB_FORCE_ROLLBACK: bool = False
+    DB_ECHO: Optional[bool] = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 60 * 30
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+    DB_STREAM_BATCH_SIZE: int = 1000
+    DB_POOL_PREWARM: bool = False
+    DB_POOL_PREWARM_CONNECTIONS: Optional[int] = None
+    DB_QUERY_INSTRUMENTATION: bool = False
+    DB_SLOW_QUERY_COUNT: int = 5
+    DB_N_PLUS_ONE_THRESHOLD: int = 3
+    POST_COUNTER_RECONCILE_BATCH_SIZE: int = 1000
+    LIKE_COUNTER_WRITE_BEHIND: bool = False
+    LIKE_COUNTER_FLUSH_INTERVAL_SECONDS: float = 1.0
+    REDIS_URL: Optional[str] = None
+    CACHE_TTL_SECONDS: int = 60
+    # In-process tier TTL when REDIS_URL is set, the longest a worker can serve a record
+    # whose invalidation broadcast it missed
+    CACHE_LOCAL_TTL_SECONDS: int = 5
+    CACHE_MAX_ENTRIES: int = 10_000
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 60 * 60 * 24
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = 100_000
+    QUERY_CACHE_TTL_SECONDS: int = 60 * 5
+    QUERY_CACHE_MAX_ENTRIES: int = 1000
     AWS_REGION: str = ""
     AWS_ACCESS_KEY_ID: str = ""
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_BUCKET_NAME: str = ""
     AWS_BUCKET_URL: str = ""
     AWS_API_VERSION: str = ""
+    # Shared by every thread using a client: the upload executor, multipart transfers and to_thread calls
+    AWS_MAX_POOL_CONNECTIONS: int = 50
+    S3_UPLOAD_MAX_WORKERS: int = 8
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNKSIZE_MB: int = 8
+    S3_MULTIPART_MAX_CONCURRENCY: int = 4
+    # Request body bytes buffered across all streaming uploads
+    S3_UPLOAD_MAX_BUFFERED_MB: int = 256
+    S3_DOWNLOAD_MAX_WORKERS: int = 16
+    # A signed URL is a few hundred bytes, so this bounds the cache to roughly 25 MB
+    PRESIGNED_URL_CACHE_MAX_ENTRIES: int = 50_000
+    # Cached URLs are handed out until this long before they expire
+    PRESIGNED_URL_EXPIRY_MARGIN_SECONDS: int = 300
+    DIRECT_UPLOAD_MAX_SIZE_MB: int = 5 * 1024
+    # Larger uploads get presigned multipart part URLs instead of a single presigned POST
+    DIRECT_UPLOAD_MULTIPART_THRESHOLD_MB: int = 100
+    DIRECT_UPLOAD_PART_SIZE_MB: int = 64
+    DIRECT_UPLOAD_EXPIRATION_SECONDS: int = 60 * 60
+    # Content-Type prefixes clients may upload, e.g. ["image/", "video/mp4"]. Empty allows any
+    DIRECT_UPLOAD_ALLOWED_CONTENT_TYPES: List[str] = []
+    S3_DOWNLOAD_CHUNK_SIZE_KB: int = 256
+    # Chunks read from S3 ahead of the client, per download
+    S3_DOWNLOAD_READ_AHEAD: int = 2
     SENTRY_DNS: str = ""
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     JWT_SECRET_KEY: str = secrets.token_urlsafe(32)
@@ -35,6 +85,22 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = ""
     OPENAI_HTTP_URL: Optional[str] = ""
     CHAT_COMPLETION_MODEL: Optional[str] = "gpt-4o"
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 30_000
+    OPENAI_DEFAULT_COMPLETION_TOKENS: int = 512
+    OPENAI_MAX_CONCURRENCY: int = 50
+    OPENAI_MAX_QUEUE_SIZE: int = 100
+    OPENAI_MAX_QUEUE_WAIT_SECONDS: float = 10.0
+    CHAT_COMPLETION_BATCH_CONCURRENCY: int = 10
+    CHAT_COMPLETION_CACHE_TTL_SECONDS: int = 60 * 60
+    CHAT_COMPLETION_CACHE_MAX_ENTRIES: int = 1000
+    HTTP_CLIENT_TIMEOUT: float = 30.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = False
+    # Per-host keepalive overrides, e.g. {"api.openai.com": 50}
+    HTTP_CLIENT_HOST_KEEPALIVE: Dict[str, int] = {}
     COGNITO_USER_POOL_ID: Optional[str] = ""
     COGNITO_CLIENT_ID: Optional[str] = ""
     COGNITO_CLIENT_SECRET: Optional[str] = ""
@@ -48,6 +114,9 @@ class Settings(BaseSettings):
     def is_local_environment(self) -> bool:
         return self.ENVIRONMENT == "local"
 
+    def is_db_echo_enabled(self) -> bool:
+        return self.is_local_environment() if self.DB_ECHO is None else self.DB_ECHO
+
     # def load_secrets_from_aws(self, secret_name: str):
     #     if self.ENVIRONMENT == "production":
     #         session = boto3.session.Session()
@@ -1,7 +1,11 @@
+import json
 import logging
+import queue
 from logging import Logger
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
 from enum import Enum
+from typing import Dict, List, Tuple
 from fastapi import Request
 
 from core.config import settings
@@ -38,6 +42,26 @@ class LoggingService:
         return self.__loger(content)
 
 
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including any `extra` fields."""
+    reserved = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **{key: value for key, value in vars(record).items() if key not in self.reserved},
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+_queue_listeners: List[QueueListener] = []
+
+
 def get_logger(name: str) -> Logger:
     return logging.getLogger(name)
 
@@ -63,7 +87,34 @@ def get_logger_dependency() -> LoggingService:
 #         return True
 
 
+def enable_queue_logging():
+    """Swaps the handlers of every configured logger for a QueueHandler and replays the
+    records on QueueListener threads, so console and file I/O never block the event loop.
+    Loggers sharing the same handlers share a listener."""
+    groups: Dict[Tuple[int, ...], List[logging.Logger]] = {}
+    for name in list(logging.root.manager.loggerDict) + [""]:
+        logger = logging.getLogger(name)
+        if logger.handlers and not any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+            groups.setdefault(tuple(id(handler) for handler in logger.handlers), []).append(logger)
+
+    for loggers in groups.values():
+        handlers = loggers[0].handlers
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        for logger in loggers:
+            logger.handlers = [QueueHandler(log_queue)]
+        listener.start()
+        _queue_listeners.append(listener)
+
+
+def stop_logging():
+    """Flushes and stops the queue listeners."""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+
 def configure_logging():
+    stop_logging()
     dictConfig({
         "version": 1,
         "disable_existing_loggers": False,
@@ -80,6 +131,10 @@ def configure_logging():
                 "datefmt": "%Y-%m-%d %H:%M:%S",
                 "format": "%(asctime)s - %(name)s:%(lineno)d - %(levelname)s - %(message)s",
             },
+            "json": {
+                "()": JsonFormatter,
+                "datefmt": "%Y-%m-%dT%H:%M:%S%z",
+            },
         },
         "handlers": {
             "default": {
@@ -96,6 +151,11 @@ def configure_logging():
                 "level": "DEBUG",
                 "encoding": "utf8",
             },
+            "access": {
+                "class": "logging.StreamHandler",
+                "formatter": "json",
+                "level": "INFO",
+            },
         },
         "loggers": {
             "uvicorn": {"handlers": ["default", "rotating_file"], "level": "INFO", "propagate": False},
@@ -109,7 +169,9 @@ def configure_logging():
                 "level": "DEBUG" if settings.is_local_environment() else "INFO",
                 "propagate": False
             },
+            "access": {"handlers": ["access"], "level": "INFO", "propagate": False},
             "databases": {"handlers": ["default"], "level": "WARNING"},
             "aiosqlite": {"handlers": ["default"], "level": "WARNING"},
         },
     })
+    enable_queue_logging()
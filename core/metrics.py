@@ -0,0 +1,238 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labelnames: Iterable[str], labelvalues: Iterable[str], **extra: str) -> str:
+    pairs = [*zip(labelnames, labelvalues), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        pass
+
+    def render(self) -> List[str]:
+        return self.header() + self.samples()
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in self.values.items()
+        ]
+
+
+class CallbackGauge(Metric):
+    """Gauge whose values are read from a callback at scrape time."""
+    type_name = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], Dict[LabelValues, float]],
+            labelnames: Tuple[str, ...] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in self.callback().items()
+        ]
+
+
+class HistogramSeries:
+    """Log-linear (HDR style) histogram: every value lands in a bucket whose width is a
+    fixed fraction of its lower bound, so quantiles keep the same relative precision
+    from sub-millisecond up to minutes while memory stays bounded."""
+
+    def __init__(self, lowest: float, precision: float):
+        self.lowest = lowest
+        self.log_base = math.log1p(precision)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+
+    def index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self.log_base) + 1
+
+    def upper_bound(self, index: int) -> float:
+        return self.lowest * math.exp(index * self.log_base)
+
+    def observe(self, value: float):
+        index = self.index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self.upper_bound(index)
+        return self.upper_bound(max(self.buckets))
+
+    def cumulative(self, bounds: Iterable[float]) -> List[Tuple[float, int]]:
+        ordered = sorted(self.buckets.items())
+        result, seen, position = [], 0, 0
+        for bound in bounds:
+            while position < len(ordered) and self.upper_bound(ordered[position][0]) <= bound * (1 + 1e-9):
+                seen += ordered[position][1]
+                position += 1
+            result.append((bound, seen))
+        return result
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    quantiles = (0.5, 0.9, 0.99)
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Tuple[str, ...] = (),
+            buckets: Tuple[float, ...] = default_buckets,
+            lowest: float = 0.0001,
+            precision: float = 0.05,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        self.lowest = lowest
+        self.precision = precision
+        self.series: Dict[LabelValues, HistogramSeries] = {}
+
+    def labels(self, *labelvalues: str) -> HistogramSeries:
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = HistogramSeries(self.lowest, self.precision)
+        return series
+
+    def observe(self, value: float, *labelvalues: str):
+        self.labels(*labelvalues).observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, series in self.series.items():
+            for bound, count in series.cumulative(self.buckets):
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le=format_value(bound))} {count}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le='+Inf')} {series.count}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(series.sum)}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {series.count}")
+        return lines
+
+    def render(self) -> List[str]:
+        # Quantiles from the high resolution buckets, exported as their own gauge family
+        quantile_name = f"{self.name}_quantile"
+        lines = super().render() + [
+            f"# HELP {quantile_name} {self.documentation} (quantiles)",
+            f"# TYPE {quantile_name} gauge",
+        ]
+        for labels, series in self.series.items():
+            for q in self.quantiles:
+                labelset = format_labels(self.labelnames, labels, quantile=format_value(q))
+                lines.append(f"{quantile_name}{labelset} {format_value(series.quantile(q))}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), **kwargs) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def gauge(
+            self,
+            name: str,
+            documentation: str,
+            callback: Callable[[], Dict[LabelValues, float]],
+            labelnames: Tuple[str, ...] = (),
+    ) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, callback, labelnames))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self.metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status_code"),
+)
+db_pool_checkouts = registry.counter(
+    "db_pool_checkouts_total",
+    "Database connections checked out of the pool",
+)
+db_sessions = registry.counter(
+    "db_sessions_total",
+    "Request scoped database sessions opened",
+)
+openai_request_duration = registry.histogram(
+    "openai_request_duration_seconds",
+    "Upstream OpenAI latency",
+    ("operation", "outcome"),
+)
+openai_time_to_first_token = registry.histogram(
+    "openai_time_to_first_token_seconds",
+    "Time until the first streamed token arrived from OpenAI",
+)
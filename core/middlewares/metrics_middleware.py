@@ -0,0 +1,43 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.metrics import http_request_duration
+import time
+
+
+def get_route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    return route.path
+
+
+class MetricsMiddleware:
+    """Records request latency per method, route template and status code. The template
+    (e.g. /v1/user/{user_id}) comes from the matched route, so label cardinality stays
+    bounded no matter which ids clients request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(
+                time.perf_counter() - start_time,
+                scope["method"],
+                get_route_template(scope),
+                str(status_code),
+            )
@@ -0,0 +1,56 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+from core.logger import get_logger
+from core.middlewares.metrics_middleware import get_route_template
+from db.instrumentation import QueryStats, current_query_stats, db_n_plus_one, db_queries_per_request
+
+logger = get_logger(__name__)
+
+
+class QueryInstrumentationMiddleware:
+    """Collects the SQL executed for each request, reports it in a Server-Timing header
+    and flags statements repeated often enough to be N+1 candidates."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(slowest=settings.DB_SLOW_QUERY_COUNT)
+        token = current_query_stats.set(stats)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.total_time * 1000:.2f};desc="{stats.count} queries"',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self.report(scope, stats)
+
+    def report(self, scope: Scope, stats: QueryStats):
+        route = get_route_template(scope)
+        db_queries_per_request.observe(stats.count, route)
+
+        candidates = stats.n_plus_one_candidates(settings.DB_N_PLUS_ONE_THRESHOLD)
+        if candidates:
+            db_n_plus_one.inc(route)
+            for statement, count in candidates.items():
+                logger.warning(f"Possible N+1 on {scope['method']} {route}: executed {count} times: {statement}")
+
+        if stats.count:
+            slowest = "; ".join(f"{duration * 1000:.2f}ms {statement}" for duration, statement in stats.slowest_statements())
+            logger.debug(
+                f"{scope['method']} {route}: {stats.count} queries in {stats.total_time * 1000:.2f}ms, "
+                f"slowest: {slowest}"
+            )
@@ -1,22 +1,38 @@
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from fastapi import Response, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from core.logger import get_logger
 import time
 
-logger = get_logger(__name__)
+logger = get_logger("access")
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        start_time = time.time()
-        logger.info(f"Request started at {start_time} | {request.method} | {request.url}")
+class RequestLoggingMiddleware:
+    """Pure ASGI request timing and logging. Unlike BaseHTTPMiddleware it doesn't wrap the
+    response in an extra task and memory stream, so streaming responses pass through."""
 
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        process_time = time.time() - start_time
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        logger.info(f"Request completed: {request.method} - {request.url} - Status: {response.status_code} - Process Time: {process_time:.2f}s")
+        start_time = time.perf_counter()
+        status_code = 500
 
-        return response
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            logger.info("Request completed", extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope["query_string"].decode("latin-1"),
+                "status_code": status_code,
+                "duration_ms": round((time.perf_counter() - start_time) * 1000, 3),
+            })
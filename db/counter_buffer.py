@@ -0,0 +1,91 @@
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.config import settings
+from core.logger import get_logger
+from db.database import DatabaseSession, get_database_session_maker
+from db.models import Post
+
+logger = get_logger(__name__)
+
+
+class CounterBuffer:
+    """Write-behind buffer for a Post counter column.
+
+    Deltas are summed per post in memory and flushed every interval as one batched
+    UPDATE, so a burst of likes on a hot post costs a single counter update instead of
+    one row lock per like. Deltas still pending when the process dies are lost. The
+    counter reconciliation job repairs them, but only while no deltas are pending
+    anywhere: it counts likes whose deltas a live buffer would add again on its next
+    flush. Run it with the workers stopped (stop() flushes) or write-behind disabled.
+    """
+
+    def __init__(self, counter, interval: float = 1.0):
+        self.counter = counter
+        self.interval = interval
+        self.pending: Dict[int, int] = defaultdict(int)
+        self.task: Optional[asyncio.Task] = None
+        self.buffered = 0
+        self.flushed = 0
+
+    def add(self, post_id: int, delta: int):
+        self.pending[post_id] += delta
+        self.buffered += 1
+
+    async def flush(self):
+        pending, self.pending = self.pending, defaultdict(int)
+        # Sorted so concurrent flushes from several workers lock rows in the same order
+        rows = [{"post_id": post_id, "delta": delta} for post_id, delta in sorted(pending.items()) if delta]
+        if not rows:
+            return
+
+        # Core table UPDATE so the list of parameters runs as a single executemany
+        table = Post.__table__
+        counter = table.columns[self.counter.key]
+        stmt = (
+            update(table)
+            .where(table.columns.id == bindparam("post_id"))
+            .values({counter: counter + bindparam("delta")})
+        )
+        try:
+            async with DatabaseSession(get_database_session_maker()) as session:
+                await session.execute(stmt, rows)
+                await session.commit()
+            self.flushed += len(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to flush {len(rows)} buffered {self.counter.key} updates: {e}")
+            # Put the deltas back so the next flush retries them
+            for row in rows:
+                self.pending[row["post_id"]] += row["delta"]
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self.pending), "buffered": self.buffered, "flushed": self.flushed}
+
+
+@lru_cache
+def get_like_counter_buffer() -> CounterBuffer:
+    return CounterBuffer(Post.like_count, interval=settings.LIKE_COUNTER_FLUSH_INTERVAL_SECONDS)
@@ -0,0 +1,96 @@
+from typing import Any, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from core.logger import get_logger
+from db.interfaces import DataBaseRepositoryInterface
+from services.cache.interfaces import CacheInterface
+
+logger = get_logger(__name__)
+
+
+class CachedRepository(DataBaseRepositoryInterface):
+    """Read-through cache in front of a repository.
+
+    Records are cached once under their primary key. Lookups by any other field
+    store a pointer to that key, so invalidating a record by id also invalidates
+    every lookup that resolved to it. With a shared tier the delete is broadcast to
+    the other workers, see TieredCache.
+    """
+
+    def __init__(self, repository: DataBaseRepositoryInterface, cache: CacheInterface, namespace: str):
+        super().__init__(repository.session)
+        self.repository = repository
+        self.cache = cache
+        self.namespace = namespace
+
+    def record_key(self, resource_id: Any) -> str:
+        return f"{self.namespace}:id={resource_id}"
+
+    def lookup_key(self, **kwargs) -> str:
+        fields = "&".join(f"{field}={value}" for field, value in sorted(kwargs.items()))
+        return f"{self.namespace}:lookup:{fields}"
+
+    async def invalidate(self, resource_id: Any):
+        await self.cache.delete(self.record_key(resource_id))
+
+    async def get_cached(self, **kwargs) -> Optional[Dict]:
+        if set(kwargs) == {"id"}:
+            return await self.cache.get(self.record_key(kwargs["id"]))
+
+        resource_id = await self.cache.get(self.lookup_key(**kwargs))
+        if resource_id is None:
+            return None
+
+        record = await self.cache.get(self.record_key(resource_id))
+        # The pointer may outlive an update that changed the looked-up field
+        if record is None or any(record.get(field) != value for field, value in kwargs.items()):
+            return None
+        return record
+
+    async def get_all(self, limit: int = 0, offset: int = 0):
+        return await self.repository.get_all(limit=limit, offset=offset)
+
+    async def get_page(self, limit: int = 50, cursor: Optional[str] = None, fields: Optional[list] = None, **kwargs):
+        return await self.repository.get_page(limit=limit, cursor=cursor, fields=fields, **kwargs)
+
+    def stream_all(self, fields: Optional[list] = None, batch_size: int = 1000):
+        return self.repository.stream_all(fields=fields, batch_size=batch_size)
+
+    async def find_many(self, **kwargs):
+        return await self.repository.find_many(**kwargs)
+
+    async def find_unique(self, **kwargs) -> Dict:
+        record = await self.get_cached(**kwargs)
+        if record is not None:
+            return record
+
+        resource = await self.repository.find_unique(**kwargs)
+        record = jsonable_encoder(resource.to_dict())
+
+        await self.cache.set(self.record_key(record["id"]), record)
+        if set(kwargs) != {"id"}:
+            await self.cache.set(self.lookup_key(**kwargs), record["id"])
+
+        return record
+
+    async def find_by_query(self, name: str, params: Optional[dict] = None):
+        return await self.repository.find_by_query(name, params)
+
+    async def create_one(self, resource) -> Dict:
+        created = await self.repository.create_one(resource)
+        await self.invalidate(created["id"])
+        return created
+
+    async def create_many(self, resources: list) -> Dict:
+        result = await self.repository.create_many(resources)
+        await self.cache.delete(*(self.record_key(created["id"]) for created in result["created"]))
+        return result
+
+    async def update_one(self, resource):
+        updated = await self.repository.update_one(resource)
+        await self.invalidate(updated.id)
+        return updated
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.future import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from core.logger import get_logger
+from db.models import FileUpload
+
+logger = get_logger(__name__)
+
+
+class FileUploadRepository:
+    """Bookkeeping for direct-to-S3 uploads. Only tracks the objects, the bytes never
+    pass through the API."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_one(
+            self,
+            key: str, file_name: str, content_type: str, max_size: int, upload_id: Optional[str] = None
+    ) -> Dict:
+        try:
+            upload = FileUpload(
+                key=key, file_name=file_name, content_type=content_type, max_size=max_size, upload_id=upload_id,
+            )
+
+            self.session.add(upload)
+            await self.session.commit()
+
+            return upload.to_dict()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to record upload: {str(e)}"
+            ) from e
+
+    async def find_unique(self, upload_id: int, for_update: bool = False) -> FileUpload:
+        """With for_update the row stays locked until the session commits, so concurrent
+        callers see each other's status changes instead of acting on the same upload."""
+        query = select(FileUpload).where(FileUpload.id == upload_id)
+        if for_update:
+            query = query.with_for_update()
+        upload = (await self.session.execute(query)).scalar_one_or_none()
+        if upload is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Upload with id {upload_id} not found")
+        return upload
+
+    async def set_status(
+            self,
+            upload: FileUpload, upload_status: str, size: Optional[int] = None, etag: Optional[str] = None
+    ) -> Dict:
+        try:
+            upload.status = upload_status
+            upload.size = size
+            upload.etag = etag
+            upload.completed_at = datetime.now(timezone.utc)
+            await self.session.commit()
+
+            return upload.to_dict()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to update upload: {str(e)}"
+            ) from e
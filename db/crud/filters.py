@@ -0,0 +1,61 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, bindparam, select
+
+
+def validate_fields(model, fields: Optional[List[str]]) -> List[str]:
+    """Returns the requested columns of model, or all of them when none are requested."""
+    columns = model.__table__.columns
+    fields = fields or [column.name for column in columns]
+    invalid = [field for field in fields if field not in columns]
+    if invalid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid fields: {invalid}")
+    return fields
+
+
+class FilterSpec:
+    """Whitelisted equality filters for a model.
+
+    The whitelist is checked against the model's columns when the spec is created, at
+    import time, so a typo fails the application start rather than a request. Values
+    are passed as named bind parameters and the statement for each combination of
+    fields is built once, so every lookup with the same fields sends identical SQL and
+    hits both SQLAlchemy's compiled cache and the driver's prepared statement cache.
+    """
+
+    def __init__(self, model, fields: Iterable[str], base: Optional[Callable[[], Select]] = None):
+        columns = model.__table__.columns
+        fields = tuple(fields)
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError(f"{model.__name__} has no columns {unknown}")
+
+        self.model = model
+        self.columns = {field: columns[field] for field in fields}
+        self.base = base or (lambda: select(model))
+        self.statements: Dict[Tuple[str, ...], Select] = {}
+
+    def validate(self, filters: Dict[str, Any]) -> Tuple[str, ...]:
+        invalid = [field for field in filters if field not in self.columns]
+        if invalid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid filter fields: {invalid}")
+        return tuple(sorted(filters))
+
+    def where(self, stmt: Select, filters: Dict[str, Any]) -> Select:
+        """Adds the filter clauses to an arbitrary statement, for queries that cannot
+        use a cached one. Execute it with params(filters)."""
+        return stmt.where(*(
+            self.columns[field] == bindparam(f"filter_{field}") for field in self.validate(filters)
+        ))
+
+    def select(self, filters: Dict[str, Any]) -> Select:
+        key = self.validate(filters)
+        stmt = self.statements.get(key)
+        if stmt is None:
+            stmt = self.statements[key] = self.where(self.base(), filters)
+        return stmt
+
+    @staticmethod
+    def params(filters: Dict[str, Any]) -> Dict[str, Any]:
+        return {f"filter_{field}": value for field, value in filters.items()}
@@ -0,0 +1,362 @@
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, func, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from core.logger import get_logger
+from sqlalchemy.exc import IntegrityError, NoResultFound, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+
+from db.interfaces import DataBaseRepositoryInterface
+from db.counter_buffer import CounterBuffer
+from db.crud.filters import FilterSpec, validate_fields
+from db.queries import query_registry
+from db.crud.user import BULK_INSERT_CHUNK_SIZE, encode_cursor, decode_cursor
+from db.models import Comment, Like, Post, User
+from schemas.post_schema import CommentRequest, LikeRequest, PostRequest
+
+logger = get_logger(__name__)
+
+
+def select_feed():
+    """Posts with their author. Like and comment counts are denormalised onto the post
+    row, and authors are fetched with one extra IN query for the whole page instead of
+    one per post."""
+    return select(Post).options(selectinload(Post.user))
+
+
+def to_feed_item(post: Post, fields: Optional[List[str]] = None) -> Dict:
+    fields = fields or [column.name for column in Post.__table__.columns]
+    return {
+        **{field: getattr(post, field) for field in fields},
+        "author": {"id": post.user.id, "username": post.user.username},
+        "like_count": post.like_count,
+        "comment_count": post.comment_count,
+    }
+
+
+POST_FILTERS = FilterSpec(Post, ("id", "author_id"), base=select_feed)
+
+
+class PostRepository(DataBaseRepositoryInterface):
+    def __init__(self, session: AsyncSession, counter_buffer: Optional[CounterBuffer] = None):
+        super().__init__(session)
+        self.counter_buffer = counter_buffer
+
+    async def get_all(self, limit: int = 0, offset: int = 0):
+        try:
+            stmt = select_feed().order_by(Post.created_at.desc(), Post.id.desc()).limit(limit).offset(offset)
+            result = await self.session.scalars(stmt)
+
+            return [to_feed_item(post) for post in result.all()]
+        except SQLAlchemyError as e:
+            logger.error(f"{e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
+
+    async def get_page(
+            self,
+            limit: int = 50,
+            cursor: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            **kwargs
+    ) -> Dict:
+        """Newest first feed with keyset pagination on (created_at, id). A page costs two
+        queries whatever its size: the posts, and their authors."""
+        fields = validate_fields(Post, fields)
+        try:
+            stmt = POST_FILTERS.where(select_feed(), kwargs)
+            if cursor:
+                stmt = stmt.where(tuple_(Post.created_at, Post.id) < decode_cursor(cursor))
+            stmt = stmt.order_by(Post.created_at.desc(), Post.id.desc()).limit(limit + 1)
+
+            result = await self.session.scalars(stmt, POST_FILTERS.params(kwargs))
+            posts = result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching posts: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+        has_more = len(posts) > limit
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id) if has_more else None
+
+        return {
+            "items": [to_feed_item(post, fields=fields) for post in posts],
+            "next_cursor": next_cursor,
+        }
+
+    async def stream_all(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> AsyncIterator[Sequence]:
+        columns = Post.__table__.columns
+        fields = validate_fields(Post, fields)
+
+        stmt = (
+            select(*(columns[field] for field in fields))
+            .order_by(Post.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for partition in result.mappings().partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def find_unique(self, **kwargs):
+        if not kwargs:
+            raise ValueError("At least one search parameter is required")
+
+        try:
+            stmt = POST_FILTERS.select(kwargs)
+
+            result = await self.session.scalars(stmt, POST_FILTERS.params(kwargs))
+            post = result.one_or_none()
+
+            if post is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+
+            return to_feed_item(post)
+        except NoResultFound:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching post: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def find_many(self, **kwargs):
+        try:
+            stmt = POST_FILTERS.select(kwargs).order_by(Post.created_at.desc(), Post.id.desc())
+
+            result = await self.session.scalars(stmt, POST_FILTERS.params(kwargs))
+            posts = result.all()
+
+            if not posts:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No posts found")
+
+            return [to_feed_item(post) for post in posts]
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching posts: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def find_by_query(self, name: str, params: Optional[dict] = None):
+        """Runs a query declared in the named query registry, never raw SQL."""
+        try:
+            rows = await query_registry.execute(self.session, name, params or {})
+            if not rows:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No records found")
+
+            return rows
+
+        except SQLAlchemyError as e:
+            logger.error(f"Error executing query '{name}': {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    async def create_one(self, post: PostRequest) -> dict:
+        try:
+            new_post = Post(**post.dict(exclude={"id"}))
+
+            self.session.add(new_post)
+            await self.session.commit()
+
+            return new_post.to_dict()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create post: {str(e)}"
+            ) from e
+
+    async def create_many(self, posts: List[PostRequest]) -> Dict[str, List[Dict]]:
+        """Inserts posts in chunked multi-row INSERT ... RETURNING statements inside a single
+        transaction. Posts have no unique columns, the only conflict is an author that
+        does not exist: those rows are reported back instead of failing the whole batch."""
+        rows = [post.dict(exclude={"id"}) for post in posts]
+        author_ids = {row["author_id"] for row in rows}
+        existing = set((await self.session.scalars(select(User.id).where(User.id.in_(author_ids)))).all())
+
+        conflicts = [
+            {"index": index, "author_id": row["author_id"], "detail": f"User with id {row['author_id']} not found"}
+            for index, row in enumerate(rows) if row["author_id"] not in existing
+        ]
+        rows = [row for row in rows if row["author_id"] in existing]
+        created = []
+
+        try:
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                stmt = (
+                    self.insert(Post)
+                    .values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+                    .returning(*Post.__table__.columns)
+                )
+                result = await self.session.execute(stmt)
+                created += [dict(row) for row in result.mappings()]
+
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create posts: {str(e)}"
+            ) from e
+
+        return {"created": created, "conflicts": conflicts}
+
+    async def update_one(self, resource: PostRequest) -> Post:
+        try:
+            stmt = select(Post).where(Post.id == resource.id)
+            result = await self.session.execute(stmt)
+            existing_post = result.scalar_one_or_none()
+
+            if not existing_post:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Post with id {resource.id} not found"
+                )
+
+            for field, value in resource.dict(exclude_unset=True, exclude={"id"}).items():
+                setattr(existing_post, field, value)
+
+            await self.session.commit()
+            await self.session.refresh(existing_post)
+
+            return existing_post
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to update post: {e}"
+            ) from e
+
+    async def increment_counter(self, post_id: int, counter, amount: int = 1) -> int:
+        """Atomic UPDATE ... SET n = n + amount. The row lock it takes is held until the
+        surrounding transaction commits, so concurrent writers never lose an update."""
+        stmt = (
+            update(Post)
+            .where(Post.id == post_id)
+            .values({counter: counter + amount})
+            .returning(counter)
+        )
+        value = (await self.session.execute(stmt)).scalar_one_or_none()
+        if value is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
+        return value
+
+    def insert(self, model):
+        """Returns the dialect specific INSERT so ON CONFLICT is available."""
+        dialect = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+        return dialect.insert(model)
+
+    async def update_like_count(self, post_id: int, delta: int) -> Optional[int]:
+        """Applies a like count change in the current transaction, or defers it to the
+        write-behind buffer when one is configured, in which case the count is unknown."""
+        if self.counter_buffer is not None:
+            return None
+        return await self.increment_counter(post_id, Post.like_count, delta)
+
+    async def like_post(self, post_id: int, like: LikeRequest) -> Dict:
+        """Idempotent like. INSERT ... ON CONFLICT DO NOTHING RETURNING tells in the same
+        round-trip whether the like is new, and only a new like touches the counter."""
+        stmt = (
+            self.insert(Like)
+            .values(post_id=post_id, user_id=like.user_id)
+            .on_conflict_do_nothing(index_elements=[Like.post_id, Like.user_id])
+            .returning(Like.id)
+        )
+        try:
+            changed = (await self.session.execute(stmt)).scalar_one_or_none() is not None
+            like_count = await self.update_like_count(post_id, 1) if changed else None
+            await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post or user not found") from e
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to like post: {str(e)}"
+            ) from e
+
+        if changed and self.counter_buffer is not None:
+            self.counter_buffer.add(post_id, 1)
+        return {
+            "post_id": post_id,
+            "user_id": like.user_id,
+            "liked": True,
+            "changed": changed,
+            "like_count": like_count,
+        }
+
+    async def unlike_post(self, post_id: int, like: LikeRequest) -> Dict:
+        """Idempotent unlike through DELETE ... RETURNING, unliking twice is a no-op."""
+        stmt = (
+            delete(Like)
+            .where(Like.post_id == post_id, Like.user_id == like.user_id)
+            .returning(Like.id)
+        )
+        try:
+            changed = (await self.session.execute(stmt)).scalar_one_or_none() is not None
+            like_count = await self.update_like_count(post_id, -1) if changed else None
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to unlike post: {str(e)}"
+            ) from e
+
+        if changed and self.counter_buffer is not None:
+            self.counter_buffer.add(post_id, -1)
+        return {
+            "post_id": post_id,
+            "user_id": like.user_id,
+            "liked": False,
+            "changed": changed,
+            "like_count": like_count,
+        }
+
+    async def add_comment(self, post_id: int, comment: CommentRequest) -> Dict:
+        try:
+            comment_count = await self.increment_counter(post_id, Post.comment_count)
+            new_comment = Comment(post_id=post_id, **comment.dict())
+
+            self.session.add(new_comment)
+            await self.session.commit()
+
+            return {**new_comment.to_dict(), "comment_count": comment_count}
+        except IntegrityError as e:
+            # The post row was found and locked above, so the missing row is the user
+            await self.session.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found") from e
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to comment on post: {str(e)}"
+            ) from e
+
+    async def reconcile_counters(self, after_id: int = 0, batch_size: int = 1000) -> Optional[int]:
+        """Recomputes the counters of the next batch of posts by id in its own transaction
+        and returns the last id processed, or None once every post has been visited. Must
+        not run while a write-behind CounterBuffer holds like deltas, see CounterBuffer."""
+        ids = (await self.session.scalars(
+            select(Post.id).where(Post.id > after_id).order_by(Post.id).limit(batch_size)
+        )).all()
+        if not ids:
+            return None
+
+        like_count = select(func.count(Like.id)).where(Like.post_id == Post.id).scalar_subquery()
+        comment_count = select(func.count(Comment.id)).where(Comment.post_id == Post.id).scalar_subquery()
+        try:
+            await self.session.execute(
+                update(Post)
+                .where(Post.id.between(ids[0], ids[-1]))
+                .values(like_count=like_count, comment_count=comment_count)
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            logger.error(f"Failed to reconcile post counters after id {after_id}: {e}")
+            raise
+
+        return ids[-1]
@@ -1,18 +1,42 @@
-from typing import AsyncGenerator
+import base64
+import json
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence
 
+from sqlalchemy import or_, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.future import select
 from core.logger import get_logger
 from sqlalchemy.exc import DatabaseError, NoResultFound, SQLAlchemyError
-from sqlalchemy.sql import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from db.interfaces import DataBaseRepositoryInterface, DataBaseSessionInterface
 from db.database import DatabaseSession, DataBaseSessionMaker
 from db.models import User
+from db.crud.filters import FilterSpec, validate_fields
+from db.queries import query_registry
 from schemas.user_schema import UserRequest
 
 logger = get_logger(__name__)
+# Keeps each multi-row INSERT well below Postgres' 32767 bind parameter limit
+BULK_INSERT_CHUNK_SIZE = 1000
+
+
+USER_FILTERS = FilterSpec(User, ("id", "email", "username", "is_confirmed"))
+
+
+def encode_cursor(created_at: datetime, user_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), user_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
 
 
 class UserRepository(DataBaseRepositoryInterface):
@@ -30,16 +54,66 @@ class UserRepository(DataBaseRepositoryInterface):
             logger.error(f"{e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{e}")
 
+    async def get_page(
+            self,
+            limit: int = 50,
+            cursor: Optional[str] = None,
+            fields: Optional[List[str]] = None,
+            **kwargs
+    ) -> Dict:
+        """Keyset pagination on (created_at, id). Only the requested columns are selected
+        so rows come back as plain mappings instead of ORM objects."""
+        columns = User.__table__.columns
+        fields = validate_fields(User, fields)
+
+        selected = {*fields, "created_at", "id"}
+        try:
+            stmt = USER_FILTERS.where(select(*(column for column in columns if column.name in selected)), kwargs)
+            if cursor:
+                stmt = stmt.where(tuple_(User.created_at, User.id) > decode_cursor(cursor))
+            stmt = stmt.order_by(User.created_at, User.id).limit(limit + 1)
+
+            result = await self.session.execute(stmt, USER_FILTERS.params(kwargs))
+            rows = result.mappings().all()
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching users: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
+
+        return {
+            "items": [{field: row[field] for field in fields} for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    async def stream_all(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> AsyncIterator[Sequence]:
+        """Yields batches of row mappings through a server-side cursor, so only one batch
+        is held in memory regardless of the table size."""
+        columns = User.__table__.columns
+        fields = validate_fields(User, fields)
+
+        stmt = (
+            select(*(columns[field] for field in fields))
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for partition in result.mappings().partitions():
+                yield partition
+        finally:
+            await result.close()
+
     async def find_unique(self, **kwargs):
         if not kwargs:
             raise ValueError("At least one search parameter is required")
 
         try:
-            stmt = select(User)
-            for field, value in kwargs.items():
-                stmt = stmt.where(getattr(User, field) == value)
+            stmt = USER_FILTERS.select(kwargs)
 
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(stmt, USER_FILTERS.params(kwargs))
             user = result.scalar_one_or_none()
 
             if user is None:
@@ -48,46 +122,36 @@ class UserRepository(DataBaseRepositoryInterface):
             return user
         except NoResultFound:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        except AttributeError as e:
-            logger.error(f"Invalid field specified: {e}")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid field: {e}")
         except SQLAlchemyError as e:
             logger.error(f"Error fetching user: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     async def find_many(self, **kwargs):
         try:
-            stmt = select(User)
-            for field, value in kwargs.items():
-                stmt = stmt.where(getattr(User, field) == value)
+            stmt = USER_FILTERS.select(kwargs)
 
-            result = await self.session.execute(stmt)
+            result = await self.session.execute(stmt, USER_FILTERS.params(kwargs))
             users = result.scalars().all()
 
             if not users:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No users found")
 
             return users
-        except AttributeError as e:
-            logger.error(f"Invalid field specified: {e}")
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid field: {e}")
         except SQLAlchemyError as e:
             logger.error(f"Error fetching users: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-    async def find_by_query(self, query: str):
+    async def find_by_query(self, name: str, params: Optional[dict] = None):
+        """Runs a query declared in the named query registry, never raw SQL."""
         try:
-            stmt = text(query)
-            result = await self.session.execute(stmt)
-
-            rows = result.fetchall()
+            rows = await query_registry.execute(self.session, name, params or {})
             if not rows:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No records found")
 
             return rows
 
         except SQLAlchemyError as e:
-            logger.error(f"Error executing raw SQL query: {e}")
+            logger.error(f"Error executing query '{name}': {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
     async def create_one(self, user: UserRequest) -> dict:
@@ -97,7 +161,6 @@ class UserRepository(DataBaseRepositoryInterface):
 
             self.session.add(new_user)
             await self.session.commit()
-            await self.session.refresh(new_user)
 
             return new_user.to_dict()
         except SQLAlchemyError as e:
@@ -107,31 +170,99 @@ class UserRepository(DataBaseRepositoryInterface):
                 detail=f"Failed to create user: {str(e)}"
             ) from e
 
+    def insert(self):
+        """Returns the dialect specific INSERT so ON CONFLICT is available."""
+        dialect = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+        return dialect.insert(User)
 
-async def update_one(self, resource: UserRequest) -> User:
-    """Update an existing user in the database."""
-    try:
-        stmt = select(User).where(User.id == resource.id)
-        result = await self.session.execute(stmt)
-        existing_user = result.scalar_one_or_none()
+    async def create_many(self, users: List[UserRequest]) -> Dict[str, List[Dict]]:
+        """Inserts users in chunked multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING
+        statements inside a single transaction. Rows rejected by the unique email/username
+        indexes are reported back instead of failing the whole batch."""
+        rows = [{**user.dict(exclude={"password"}), "is_confirmed": False} for user in users]
+        created = []
+
+        try:
+            for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+                stmt = (
+                    self.insert()
+                    .values(rows[start:start + BULK_INSERT_CHUNK_SIZE])
+                    .on_conflict_do_nothing()
+                    .returning(*User.__table__.columns)
+                )
+                result = await self.session.execute(stmt)
+                created += [dict(row) for row in result.mappings()]
 
-        if not existing_user:
+            await self.session.commit()
+        except SQLAlchemyError as e:
+            await self.session.rollback()
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User with id {resource.id} not found"
-            )
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to create users: {str(e)}"
+            ) from e
+
+        return {"created": created, "conflicts": await self.get_conflicts(rows, created)}
 
-        for field, value in resource.dict(exclude_unset=True).items():
-            setattr(existing_user, field, value)
+    async def get_conflicts(self, rows: List[Dict], created: List[Dict]) -> List[Dict]:
+        # Email and username are both unique, so a pair comes back from RETURNING at most
+        # once and only for the first row that carries it
+        created_pairs = {(row["email"], row["username"]) for row in created}
+        rejected = []
+        for index, row in enumerate(rows):
+            if (row["email"], row["username"]) in created_pairs:
+                created_pairs.discard((row["email"], row["username"]))
+            else:
+                rejected.append((index, row))
+        if not rejected:
+            return []
 
-        await self.session.commit()
-        await self.session.refresh(existing_user)
+        stmt = select(User.email, User.username).where(or_(
+            User.email.in_([row["email"] for _, row in rejected]),
+            User.username.in_([row["username"] for _, row in rejected]),
+        ))
+        existing = (await self.session.execute(stmt)).all()
+        existing_emails = {email for email, _ in existing}
+        existing_usernames = {username for _, username in existing}
 
-        return existing_user
+        conflicts = []
+        for index, row in rejected:
+            fields = [
+                field for field, values in (("email", existing_emails), ("username", existing_usernames))
+                if row[field] in values
+            ]
+            conflicts.append({
+                "index": index,
+                "email": row["email"],
+                "username": row["username"],
+                "detail": f"User with this {' and '.join(fields) or 'email or username'} already exists",
+            })
 
-    except SQLAlchemyError as e:
-        await self.session.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update user: {e}"
-        ) from e
+        return conflicts
+
+    async def update_one(self, resource: UserRequest) -> User:
+        """Update an existing user in the database."""
+        try:
+            stmt = select(User).where(User.id == resource.id)
+            result = await self.session.execute(stmt)
+            existing_user = result.scalar_one_or_none()
+
+            if not existing_user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"User with id {resource.id} not found"
+                )
+
+            for field, value in resource.dict(exclude_unset=True).items():
+                setattr(existing_user, field, value)
+
+            await self.session.commit()
+            await self.session.refresh(existing_user)
+
+            return existing_user
+
+        except SQLAlchemyError as e:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to update user: {e}"
+            ) from e
@@ -1,10 +1,11 @@
+import asyncio
 from dataclasses import dataclass
 from functools import lru_cache
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from sqlalchemy import event, text
 from tenacity import after_log, before_log, retry, stop_after_attempt, wait_fixed
 
 from db.interfaces import \
@@ -15,6 +16,8 @@ from db.interfaces import \
     DeclarativeBaseInterface
 from core.logger import get_logger, LoggingLevelEnum
 from core.config import settings
+from core.metrics import registry, db_pool_checkouts, db_sessions
+from db.instrumentation import instrument_engine
 
 logger = get_logger(__name__)
 max_tries = 60 * 5
@@ -23,9 +26,32 @@ wait_seconds = 10
 # engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=True)
 
 
+def get_engine_connect_args() -> dict:
+    if "asyncpg" not in str(settings.ASYNC_DATABASE_URL):
+        return {}
+    # Prepared statements are cached per connection by SQL text
+    connect_args = {"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return connect_args
+
+
 @dataclass
 class DataBaseEngine(DataBaseEngineInterface):
-    engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=True)
+    def __post_init__(self):
+        self.engine = create_async_engine(
+            settings.ASYNC_DATABASE_URL,
+            echo=settings.is_db_echo_enabled(),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            connect_args=get_engine_connect_args(),
+        )
+        event.listen(self.engine.sync_engine, "checkout", lambda *args: db_pool_checkouts.inc())
+        if settings.DB_QUERY_INSTRUMENTATION:
+            instrument_engine(self.engine)
 
     def get_engine(self) -> AsyncEngine:
         return self.engine
@@ -42,11 +68,11 @@ class DeclarativeBase(DeclarativeBaseInterface):
 class DataBaseSessionMaker(DataBaseSessionMakerInterface):
     def __init__(self, database_engine: DataBaseEngineInterface):
         self.engine = database_engine.get_engine()
-        self.database_session = sessionmaker(
-            bind=self.engine, class_=AsyncSession, autoflush=False
+        self.database_session = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
         )
 
-    def get_session_maker(self) -> sessionmaker:
+    def get_session_maker(self) -> async_sessionmaker:
         return self.database_session
 
 
@@ -66,17 +92,39 @@ class DataBaseInitializer(DataBaseInitializerInterface):
         try:
             async with self.engine.begin() as conn:
                 await conn.run_sync(self.Base.metadata.create_all)
-            await self.engine.dispose()
         except Exception as e:
             logger.error("Failed to initialize database", exc_info=e)
             raise e
 
+    async def prewarm_pool(self, connections: Optional[int] = None):
+        """Opens pool connections ahead of traffic so the first requests after a deploy
+        don't pay for the Postgres handshake."""
+        connections = min(connections or settings.DB_POOL_SIZE, settings.DB_POOL_SIZE)
+        logger.info(f"Pre-warming database pool with {connections} connections")
+
+        async def checkout():
+            try:
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    # Hold the connection until every checkout has opened its own one
+                    await barrier.wait()
+            except Exception:
+                await barrier.abort()
+                raise
+
+        barrier = asyncio.Barrier(connections)
+        try:
+            await asyncio.gather(*(checkout() for _ in range(connections)))
+        except Exception as e:
+            logger.error("Failed to pre-warm database pool", exc_info=e)
+
 
 class DatabaseSession(DataBaseSessionInterface):
     def __init__(self, database_session: DataBaseSessionMakerInterface):
         self.async_session = database_session.get_session_maker()
 
     async def __aenter__(self) -> AsyncSession:
+        db_sessions.inc()
         self.session = self.async_session()
         return self.session
 
@@ -107,7 +155,8 @@ def get_declarative_base() -> DeclarativeBaseInterface:
     return DeclarativeBase()
 
 
-def get_database_session_maker():
+@lru_cache
+def get_database_session_maker() -> DataBaseSessionMakerInterface:
     return DataBaseSessionMaker(get_database_engine())
 
 
@@ -115,3 +164,21 @@ def get_database_initializer() -> DataBaseInitializerInterface:
     return DataBaseInitializer(get_database_engine(), get_declarative_base())
 
 
+def get_database_pool_status() -> dict:
+    pool = get_database_engine().get_engine().pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        ("size",): pool.size(),
+        ("checked_out",): pool.checkedout(),
+        ("checked_in",): pool.checkedin(),
+        ("overflow",): pool.overflow(),
+    }
+
+
+registry.gauge(
+    "db_pool_connections",
+    "Database connection pool occupancy",
+    get_database_pool_status,
+    ("state",),
+)
@@ -0,0 +1,77 @@
+import heapq
+import time
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.metrics import registry
+
+db_queries = registry.counter("db_queries_total", "SQL statements executed")
+db_query_duration = registry.histogram("db_query_duration_seconds", "SQL statement execution time")
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request",
+    ("route",),
+    buckets=(1, 2, 3, 5, 10, 25, 50, 100),
+    lowest=1,
+    precision=0.1,
+)
+db_n_plus_one = registry.counter(
+    "db_n_plus_one_total",
+    "Requests that repeated an identical statement often enough to be an N+1 candidate",
+    ("route",),
+)
+
+
+class QueryStats:
+    """Queries executed while serving one request."""
+
+    def __init__(self, slowest: int):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_slowest = slowest
+        self.slowest: List[Tuple[float, str]] = []
+        self.statements: StatementCounter = StatementCounter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if len(self.slowest) < self.max_slowest:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+    def slowest_statements(self) -> List[Tuple[float, str]]:
+        return sorted(self.slowest, reverse=True)
+
+    def n_plus_one_candidates(self, threshold: int) -> Dict[str, int]:
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    db_queries.inc()
+    db_query_duration.observe(duration)
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Times every statement through engine events. Statements are grouped by their SQL
+    text, which excludes bound values, so a lazy load repeated per row shows up as the
+    same statement many times."""
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
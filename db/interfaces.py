@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Any
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator, Any, Optional
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 
 class DataBaseSessionInterface(ABC):
@@ -15,10 +14,14 @@ class DataBaseInitializerInterface(ABC):
     async def initialize_database(self):
         pass
 
+    @abstractmethod
+    async def prewarm_pool(self, connections: Optional[int] = None):
+        pass
+
 
 class DataBaseSessionMakerInterface(ABC):
     @abstractmethod
-    def get_session_maker(self) -> sessionmaker:
+    def get_session_maker(self) -> async_sessionmaker:
         pass
 
 
@@ -42,6 +45,14 @@ class DataBaseRepositoryInterface(ABC):
     async def get_all(self, limit: int = 0, offset: int = 0):
         pass
 
+    @abstractmethod
+    async def get_page(self, limit: int = 50, cursor: Optional[str] = None, fields: Optional[list] = None, **kwargs):
+        pass
+
+    @abstractmethod
+    def stream_all(self, fields: Optional[list] = None, batch_size: int = 1000):
+        pass
+
     @abstractmethod
     async def find_many(self, **kwargs):
         pass
@@ -51,13 +62,17 @@ class DataBaseRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    async def find_by_query(self, query: str):
+    async def find_by_query(self, name: str, params: Optional[dict] = None):
         pass
 
     @abstractmethod
     async def create_one(self, resource):
         pass
 
+    @abstractmethod
+    async def create_many(self, resources: list):
+        pass
+
     @abstractmethod
     async def update_one(self, resource):
         pass
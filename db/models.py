@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List, Optional, Dict, Set
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 from db.database import get_declarative_base
@@ -17,6 +17,9 @@ class ModelBaseInterface(ABC):
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        Index("ix_user_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String, unique=True, index=True)
@@ -41,6 +44,9 @@ class User(Base):
 
 class Post(Base):
     __tablename__: str = "post"
+    __table_args__ = (
+        Index("ix_post_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String)
@@ -53,6 +59,9 @@ class Post(Base):
     )
     author_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
     image_url: Mapped[str] = mapped_column(String)
+    # Denormalised counters, kept in step by PostRepository in the same transaction as the row insert
+    like_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     user: Mapped["User"] = relationship(back_populates="posts")
     likes: Mapped[List["Like"]] = relationship(back_populates="post", cascade="all, delete-orphan")
     comments: Mapped[List["Comment"]] = relationship(back_populates="post", cascade="all, delete-orphan")
@@ -63,10 +72,13 @@ class Post(Base):
 
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        Index("uq_likes_post_id_user_id", "post_id", "user_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     post_id: Mapped[int] = mapped_column(ForeignKey("post.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -82,10 +94,13 @@ class Like(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_post_id_created_at", "post_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     post_id: Mapped[int] = mapped_column(ForeignKey("post.id"))
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
     content: Mapped[str] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -97,4 +112,28 @@ class Comment(Base):
     post: Mapped["Post"] = relationship(back_populates="comments")
 
     def to_dict(self, exclude: Optional[Set[str]] = {}) -> Dict:
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name not in exclude}
\ No newline at end of file
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name not in exclude}
+
+
+class FileUpload(Base):
+    """An object a client uploads straight to S3. Created as pending when the presigned
+    request is issued and completed once the object has been checked in the bucket."""
+    __tablename__ = "file_uploads"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    key: Mapped[str] = mapped_column(String, unique=True)
+    file_name: Mapped[str] = mapped_column(String)
+    content_type: Mapped[str] = mapped_column(String)
+    max_size: Mapped[int] = mapped_column(BigInteger)
+    # Only set for multipart uploads
+    upload_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    status: Mapped[str] = mapped_column(String, default="pending", server_default="pending")
+    size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    etag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def to_dict(self, exclude: Optional[Set[str]] = {}) -> Dict:
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name not in exclude}
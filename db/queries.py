@@ -0,0 +1,132 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import Field, TypeAdapter, ValidationError
+from sqlalchemy import DateTime, Integer, TextClause, bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.types import TypeEngine
+
+from core.config import settings
+from services.cache.cache import InMemoryCache, TieredCache, get_redis_cache
+from services.cache.interfaces import CacheInterface
+
+@dataclass
+class NamedQuery:
+    """A SQL statement declared once with typed bind parameters.
+
+    The SQL text never changes between calls, so asyncpg reuses the statement it
+    prepared on the connection the first time, skipping parse and plan.
+    """
+    name: str
+    sql: str
+    params: Dict[str, TypeEngine] = field(default_factory=dict)
+    # Pydantic Field constraints per parameter, e.g. {"limit": {"ge": 1, "le": 100}}
+    constraints: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    cacheable: bool = False
+    ttl: Optional[int] = None
+
+    def __post_init__(self):
+        self.statement: TextClause = text(self.sql).bindparams(
+            *(bindparam(name, type_=type_) for name, type_ in self.params.items())
+        )
+        self.adapters = {
+            name: TypeAdapter(Annotated[type_.python_type, Field(**self.constraints.get(name, {}))])
+            for name, type_ in self.params.items()
+        }
+
+    def bind(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Checks the arguments against the declared parameters and their constraints and
+        coerces them to the declared types, so values coming from a query string are
+        accepted. Arguments come from untrusted query strings, anything that sizes the
+        result (a LIMIT) has to be bounded by a constraint."""
+        missing = [name for name in self.params if name not in arguments]
+        unknown = [name for name in arguments if name not in self.params]
+        if missing or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Query '{self.name}' expects {list(self.params)}, missing {missing}, unknown {unknown}",
+            )
+        try:
+            return {name: self.adapters[name].validate_python(value) for name, value in arguments.items()}
+        except ValidationError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid arguments: {e}") from e
+
+    def cache_key(self, arguments: Dict[str, Any]) -> str:
+        payload = json.dumps(jsonable_encoder(arguments), sort_keys=True)
+        return f"{self.name}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+class QueryRegistry:
+    def __init__(self, cache: Optional[CacheInterface] = None):
+        self.queries: Dict[str, NamedQuery] = {}
+        self.cache = cache
+
+    def register(self, query: NamedQuery) -> NamedQuery:
+        if query.name in self.queries:
+            raise ValueError(f"Query '{query.name}' is already registered")
+        self.queries[query.name] = query
+        return query
+
+    def get(self, name: str) -> NamedQuery:
+        query = self.queries.get(name)
+        if query is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown query '{name}'")
+        return query
+
+    async def execute(self, session: AsyncSession, name: str, arguments: Dict[str, Any]) -> List[Dict]:
+        query = self.get(name)
+        arguments = query.bind(arguments)
+
+        if query.cacheable and self.cache is not None:
+            rows = await self.cache.get(query.cache_key(arguments))
+            if rows is not None:
+                return rows
+
+        result = await session.execute(query.statement, arguments)
+        rows = jsonable_encoder([dict(row) for row in result.mappings()])
+
+        if query.cacheable and self.cache is not None:
+            await self.cache.set(query.cache_key(arguments), rows, query.ttl)
+        return rows
+
+
+@lru_cache
+def get_query_cache() -> CacheInterface:
+    return TieredCache(
+        local=InMemoryCache(max_entries=settings.QUERY_CACHE_MAX_ENTRIES, ttl=settings.QUERY_CACHE_TTL_SECONDS),
+        shared=get_redis_cache(prefix="query", ttl=settings.QUERY_CACHE_TTL_SECONDS),
+    )
+
+
+query_registry = QueryRegistry(cache=get_query_cache())
+
+query_registry.register(NamedQuery(
+    name="users_created_per_day",
+    sql='SELECT date(created_at) AS day, count(*) AS users FROM "user" '
+        'WHERE created_at >= :since GROUP BY date(created_at) ORDER BY day',
+    params={"since": DateTime(timezone=True)},
+    cacheable=True,
+))
+query_registry.register(NamedQuery(
+    name="top_posts_by_likes",
+    sql="SELECT id, title, author_id, like_count, comment_count FROM post "
+        "ORDER BY like_count DESC, id LIMIT :limit",
+    params={"limit": Integer()},
+    # Every distinct limit is cached separately, so it is bounded as well
+    constraints={"limit": {"ge": 1, "le": 100}},
+    cacheable=True,
+    ttl=60,
+))
+query_registry.register(NamedQuery(
+    name="user_activity",
+    sql="SELECT "
+        "(SELECT count(*) FROM post WHERE author_id = :user_id) AS posts, "
+        "(SELECT count(*) FROM likes WHERE user_id = :user_id) AS likes, "
+        "(SELECT count(*) FROM comments WHERE user_id = :user_id) AS comments",
+    params={"user_id": Integer()},
+))
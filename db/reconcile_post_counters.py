@@ -0,0 +1,50 @@
+"""Recomputes the denormalised post like/comment counters from the likes and comments
+tables, one batch of posts per transaction so locks are held briefly.
+
+Likes buffered by a write-behind CounterBuffer are already counted here, so a flush
+afterwards would add them a second time. With LIKE_COUNTER_WRITE_BEHIND the job
+refuses to run: stop the workers, which flush on shutdown, and run it with
+LIKE_COUNTER_WRITE_BEHIND=false.
+
+    python -m db.reconcile_post_counters
+"""
+import asyncio
+
+from core.config import settings
+from core.logger import configure_logging, get_logger, stop_logging
+from db.crud.post import PostRepository
+from db.database import DatabaseSession, get_database_engine, get_database_session_maker
+
+logger = get_logger(__name__)
+
+
+async def reconcile_post_counters(batch_size: int = settings.POST_COUNTER_RECONCILE_BATCH_SIZE) -> int:
+    reconciled, after_id = 0, 0
+    async with DatabaseSession(get_database_session_maker()) as session:
+        repository = PostRepository(session)
+        while (last_id := await repository.reconcile_counters(after_id, batch_size)) is not None:
+            reconciled += 1
+            after_id = last_id
+            logger.info(f"Reconciled post counters up to id {after_id}")
+    return reconciled
+
+
+async def main():
+    configure_logging()
+    if settings.LIKE_COUNTER_WRITE_BEHIND:
+        logger.error(
+            "Not reconciling while LIKE_COUNTER_WRITE_BEHIND is enabled, pending like deltas would be "
+            "counted twice. Stop the workers and run with LIKE_COUNTER_WRITE_BEHIND=false."
+        )
+        stop_logging()
+        raise SystemExit(1)
+    try:
+        batches = await reconcile_post_counters()
+        logger.info(f"Post counter reconciliation finished in {batches} batches")
+    finally:
+        await get_database_engine().get_engine().dispose()
+        stop_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,25 @@
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
-from core.logger import configure_logging, get_logger
+from core.config import settings
+from core.logger import configure_logging, get_logger, stop_logging
 from api.v1.main import v1_router
-from db.database import get_database_initializer
+from db.database import get_database_initializer, get_database_engine
+from services.http.http_client import HttpClientSingleton
+from services.cache.cache import get_user_cache
+from services.AI.cached_chat_completion import get_chat_completion_cache
+from services.cache.idempotency import get_idempotency_store
+from db.counter_buffer import get_like_counter_buffer
+from db.queries import get_query_cache
+from services.aws.executor import get_download_executor, get_upload_executor
+from services.aws.aws_client import AWSClientRegistry, AwsServiceEnum
+from services.aws.s3_client import get_presigned_url_cache
 # Routes
 from api.v1.main import v1_router
 from core.middlewares.request_logger_middleware import RequestLoggingMiddleware
+from core.middlewares.metrics_middleware import MetricsMiddleware
+from core.middlewares.query_instrumentation_middleware import QueryInstrumentationMiddleware
+from core.metrics import registry
+from fastapi.responses import PlainTextResponse
 # Middlewares
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
@@ -17,14 +31,40 @@ logger = get_logger(__name__)
 async def lifespan(_app: FastAPI) -> None:
     logger.info("Starting application")
     configure_logging()
-    await get_database_initializer().initialize_database()
+    database_initializer = get_database_initializer()
+    await database_initializer.initialize_database()
+    if settings.DB_POOL_PREWARM:
+        await database_initializer.prewarm_pool(settings.DB_POOL_PREWARM_CONNECTIONS)
+    HttpClientSingleton.get_instance()
+    get_user_cache().start()
+    if settings.AWS_REGION:
+        # Built up front so the first request does not pay for it, skipped when S3 is not configured
+        AWSClientRegistry.get_client(AwsServiceEnum.S3.value)
+    if settings.LIKE_COUNTER_WRITE_BEHIND:
+        get_like_counter_buffer().start()
     yield
+    if settings.LIKE_COUNTER_WRITE_BEHIND:
+        await get_like_counter_buffer().stop()
+    await HttpClientSingleton.close_instance()
+    await get_user_cache().close()
+    await get_chat_completion_cache().close()
+    await get_idempotency_store().close()
+    await get_query_cache().close()
+    await get_presigned_url_cache().close()
+    get_upload_executor().shutdown()
+    get_download_executor().shutdown()
+    AWSClientRegistry.close_all()
+    await get_database_engine().get_engine().dispose()
+    stop_logging()
 
 
 app = FastAPI(lifespan=lifespan)
 
 # Middlewares
-app.middleware(RequestLoggingMiddleware)
+app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.DB_QUERY_INSTRUMENTATION:
+    app.add_middleware(QueryInstrumentationMiddleware)
 
 # Routes
 app.include_router(v1_router)
@@ -44,4 +84,14 @@ def init():
     return {"result": "Success"}
 
 
+@app.get("/healthcheck/http-client")
+def http_client_pool_stats():
+    return HttpClientSingleton.get_instance().pool_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 handler = Mangum(app, lifespan="off")
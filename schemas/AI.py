@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class OpenAIPromptBase(BaseModel):
@@ -14,7 +14,10 @@ class ImageGeneratorRequest(OpenAIPromptBase):
 
 
 class ChatCompletionRequest(OpenAIPromptBase):
-    pass
-
+    stream: bool = Field(default=False)
 
 
+class ChatCompletionBatchRequest(BaseModel):
+    items: List[ChatCompletionRequest] = Field(min_length=1, max_length=1000)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    stream: bool = Field(default=False)
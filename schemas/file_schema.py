@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class PresignRequest(BaseModel):
+    file_names: List[str] = Field(min_length=1, max_length=1000)
+    # S3 rejects signatures valid for longer than 7 days
+    expiration: int = Field(default=3600, ge=1, le=60 * 60 * 24 * 7)
+
+
+class DirectUploadRequest(BaseModel):
+    file_name: str = Field(min_length=1, max_length=255, pattern=r"^[\w.\-]+$")
+    content_type: str = Field(min_length=1, max_length=255)
+    size: int = Field(ge=1)
+
+
+class UploadedPart(BaseModel):
+    part_number: int = Field(ge=1, le=10_000)
+    etag: str = Field(min_length=1)
+
+
+class CompleteUploadRequest(BaseModel):
+    # Required for multipart uploads, the ETags S3 returned for each part
+    parts: Optional[List[UploadedPart]] = None
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional
+
+
+class PostBase(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    title: str = Field(min_length=1, max_length=255)
+    content: str = Field(min_length=1)
+    image_url: str = Field(default="", max_length=2048)
+    author_id: int
+
+
+class PostRequest(PostBase):
+    id: Optional[int] = None
+
+
+class LikeRequest(BaseModel):
+    user_id: int
+
+
+class CommentRequest(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int
+    content: str = Field(min_length=1, max_length=2000)
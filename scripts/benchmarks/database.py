@@ -0,0 +1,42 @@
+"""Throwaway database for the benchmarks that seed, wipe or re-index tables.
+
+Those benchmarks never run against the configured application database. They use
+BENCHMARK_DATABASE_URL when it is set, for a Postgres plan, and a temporary SQLite
+file otherwise:
+
+    BENCHMARK_DATABASE_URL=postgresql+asyncpg://localhost/benchmark poetry run python -m ...
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+from sqlalchemy.engine import make_url
+
+from core.config import settings
+from db.database import get_database_engine
+
+
+def same_database(url: str, other: str) -> bool:
+    first, second = make_url(url), make_url(other)
+    return (first.host, first.port, first.database) == (second.host, second.port, second.database)
+
+
+def use_benchmark_database() -> str:
+    """Points the settings at the benchmark database and returns its URL. Has to run
+    before anything builds the engine."""
+    if get_database_engine.cache_info().currsize:
+        raise RuntimeError("The database engine is already built, select the benchmark database first")
+
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if not url:
+        directory = tempfile.mkdtemp(prefix="benchmark-")
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'benchmark.db')}"
+    elif any(same_database(url, configured) for configured in (settings.ASYNC_DATABASE_URL, settings.DATABASE_URL)
+             if configured):
+        raise SystemExit("BENCHMARK_DATABASE_URL is the application database, refusing to seed or wipe it")
+
+    settings.ASYNC_DATABASE_URL = url
+    print(f"benchmark database: {make_url(url).render_as_string(hide_password=True)}")
+    return url
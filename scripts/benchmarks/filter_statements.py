@@ -0,0 +1,78 @@
+"""CPU per find_unique lookup with statements rebuilt from getattr() on every call versus
+the cached bindparam statements of USER_FILTERS.
+
+Seeds a throwaway database (see database.py) with a few users and looks them up by
+email, reporting process CPU time rather than wall time so the database round-trip
+does not hide the Python side cost of building and compiling the statement.
+
+    poetry run python -m scripts.benchmarks.filter_statements 20000
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import delete, insert, select
+
+from db.crud.user import USER_FILTERS
+from db.database import DatabaseSession, get_database_initializer, get_database_session_maker
+from db.models import User
+from scripts.benchmarks.database import use_benchmark_database
+
+USERS = 100
+
+
+def legacy_statement(filters: dict):
+    stmt = select(User)
+    for field, value in filters.items():
+        stmt = stmt.where(getattr(User, field) == value)
+    return stmt, {}
+
+
+def cached_statement(filters: dict):
+    return USER_FILTERS.select(filters), USER_FILTERS.params(filters)
+
+
+async def seed():
+    async with DatabaseSession(get_database_session_maker()) as session:
+        await session.execute(delete(User))
+        await session.execute(insert(User), [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "is_confirmed": False}
+            for i in range(USERS)
+        ])
+        await session.commit()
+
+
+async def measure(name: str, build, lookups: int) -> float:
+    async with DatabaseSession(get_database_session_maker()) as session:
+        build_time = 0.0
+        start = time.process_time()
+        for i in range(lookups):
+            filters = {"email": f"user{i % USERS}@example.com"}
+            build_start = time.process_time()
+            stmt, params = build(filters)
+            build_time += time.process_time() - build_start
+            (await session.execute(stmt, params)).scalar_one()
+            session.expunge_all()
+        elapsed = time.process_time() - start
+
+    print(
+        f"{name:<22} {elapsed / lookups * 1e6:8.1f} us CPU/lookup "
+        f"({build_time / lookups * 1e6:6.1f} us building the statement)"
+    )
+    return elapsed / lookups
+
+
+async def main(lookups: int):
+    use_benchmark_database()
+    await get_database_initializer().initialize_database()
+    await seed()
+
+    # Warm up both paths so the compiled cache is populated before measuring
+    await measure("warmup", cached_statement, 100)
+    legacy = await measure("getattr per call", legacy_statement, lookups)
+    cached = await measure("cached bindparam", cached_statement, lookups)
+    print(f"saved {(legacy - cached) * 1e6:.1f} us CPU per lookup ({cached / legacy - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
@@ -0,0 +1,108 @@
+"""Query plans for per-post and per-user likes/comments lookups, with and without the
+indexes added in 5a7c91e3f0d2.
+
+Seeds a throwaway database (see database.py), drops the indexes, prints each query's
+plan and timing, recreates the indexes and prints them again. Never touches the
+application database, the indexes there are only built by the migration. Set
+BENCHMARK_DATABASE_URL to a Postgres database to get EXPLAIN ANALYZE plans, which
+should go from Seq Scan to Index (Only) Scan.
+
+    poetry run python -m scripts.benchmarks.likes_comments_indexes 2000 200
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from db.crud.user import BULK_INSERT_CHUNK_SIZE
+from db.database import DatabaseSession, get_database_initializer, get_database_session_maker
+from db.models import Comment, Like, Post, User
+from scripts.benchmarks.database import use_benchmark_database
+
+QUERIES = {
+    "likes of a post": "SELECT count(*) FROM likes WHERE post_id = :post_id",
+    "has user liked post": "SELECT 1 FROM likes WHERE post_id = :post_id AND user_id = :user_id",
+    "latest comments of a post": (
+        "SELECT * FROM comments WHERE post_id = :post_id ORDER BY created_at DESC LIMIT 20"
+    ),
+    "likes history of a user": "SELECT post_id FROM likes WHERE user_id = :user_id",
+    "comments history of a user": "SELECT post_id FROM comments WHERE user_id = :user_id",
+}
+INDEXES = [*Like.__table__.indexes, *Comment.__table__.indexes]
+
+
+async def insert_chunked(session, model, rows):
+    for start in range(0, len(rows), BULK_INSERT_CHUNK_SIZE):
+        await session.execute(insert(model), rows[start:start + BULK_INSERT_CHUNK_SIZE])
+
+
+async def seed(posts: int, users: int):
+    async with DatabaseSession(get_database_session_maker()) as session:
+        for model in (Like, Comment, Post, User):
+            await session.execute(delete(model))
+
+        await insert_chunked(session, User, [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "is_confirmed": False}
+            for i in range(1, users + 1)
+        ])
+        await insert_chunked(session, Post, [
+            {"id": i, "title": f"post {i}", "content": "", "image_url": "", "author_id": i % users + 1}
+            for i in range(1, posts + 1)
+        ])
+        # Every user likes every post whose id shares their parity, and comments on every tenth
+        await insert_chunked(session, Like, [
+            {"post_id": post_id, "user_id": user_id}
+            for post_id in range(1, posts + 1)
+            for user_id in range(1 + post_id % 2, users + 1, 2)
+        ])
+        await insert_chunked(session, Comment, [
+            {"post_id": post_id, "user_id": user_id, "content": "comment"}
+            for post_id in range(1, posts + 1)
+            for user_id in range(1 + post_id % 10, users + 1, 10)
+        ])
+        await session.commit()
+
+
+async def explain(session, label: str):
+    dialect = session.bind.dialect.name
+    prefix = "EXPLAIN ANALYZE" if dialect == "postgresql" else "EXPLAIN QUERY PLAN"
+    params = {"post_id": 1, "user_id": 3}
+
+    print(f"\n=== {label} ===")
+    for name, query in QUERIES.items():
+        start = time.perf_counter()
+        for _ in range(100):
+            await session.execute(text(query), params)
+        elapsed = (time.perf_counter() - start) / 100
+
+        plan = (await session.execute(text(f"{prefix} {query}"), params)).all()
+        print(f"\n{name}: {elapsed * 1000:.3f} ms")
+        for row in plan:
+            print(f"    {row[-1]}")
+
+
+async def main(posts: int, users: int):
+    use_benchmark_database()
+    await get_database_initializer().initialize_database()
+    await seed(posts, users)
+
+    async with DatabaseSession(get_database_session_maker()) as session:
+        for index in INDEXES:
+            await session.execute(DropIndex(index, if_exists=True))
+        await session.execute(text("ANALYZE"))
+        await explain(session, "without indexes")
+
+        for index in INDEXES:
+            await session.execute(CreateIndex(index))
+        await session.execute(text("ANALYZE"))
+        await explain(session, "with indexes")
+        await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    ))
@@ -0,0 +1,69 @@
+"""Time to sign the URLs of one gallery page: get_signed_url per key, each with its own
+thread hop as before, versus one get_signed_urls call on a cold and on a warm cache.
+
+Signing is local, no S3 endpoint is needed.
+
+    poetry run python -m scripts.benchmarks.presign_batch 500
+"""
+import asyncio
+import os
+import sys
+import time
+from asyncio import to_thread
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_BUCKET_NAME", "benchmark")
+
+from core.config import settings
+from services.aws.aws_client import AWSClientRegistry, AwsServiceEnum
+from services.aws.s3_client import FOLDER_NAME, AWSClientS3, get_presigned_url_cache
+
+ROUNDS = 5
+
+
+async def per_key(client: AWSClientS3, file_names):
+    s3 = AWSClientRegistry.get_client(AwsServiceEnum.S3.value).get_client()
+    for file_name in file_names:
+        await to_thread(
+            s3.generate_presigned_url,
+            "get_object",
+            Params={"Bucket": settings.AWS_BUCKET_NAME, "Key": f"{FOLDER_NAME}/{file_name}"},
+            ExpiresIn=3600,
+        )
+
+
+async def batch_cold(client: AWSClientS3, file_names):
+    get_presigned_url_cache().entries.clear()
+    await client.get_signed_urls(file_names)
+
+
+async def batch_warm(client: AWSClientS3, file_names):
+    await client.get_signed_urls(file_names)
+
+
+async def measure(name: str, render, client: AWSClientS3, file_names) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        await render(client, file_names)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<22} {best * 1e3:8.2f} ms/page  {best / len(file_names) * 1e6:7.1f} us/URL")
+    return best
+
+
+async def main(keys: int):
+    client = AWSClientS3(AWSClientRegistry.get_client(AwsServiceEnum.S3.value))
+    file_names = [f"gallery/{index}.jpg" for index in range(keys)]
+    await client.get_signed_urls(file_names[:1])
+
+    legacy = await measure("to_thread per key", per_key, client, file_names)
+    await measure("batch, cold cache", batch_cold, client, file_names)
+    warm = await measure("batch, warm cache", batch_warm, client, file_names)
+    print(f"warm cache is {legacy / warm:.0f}x faster per page; {get_presigned_url_cache().stats()}")
+    AWSClientRegistry.close_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
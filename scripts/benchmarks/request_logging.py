@@ -0,0 +1,85 @@
+"""Requests per second with the old BaseHTTPMiddleware + synchronous file logging versus
+the pure ASGI middleware logging through a QueueListener.
+
+    poetry run python -m scripts.benchmarks.request_logging
+"""
+import asyncio
+import logging
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from core.logger import JsonFormatter, enable_queue_logging, stop_logging
+from core.middlewares.request_logger_middleware import RequestLoggingMiddleware
+
+REQUESTS = 5_000
+CONCURRENCY = 50
+legacy_logger = logging.getLogger("benchmark.legacy")
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        legacy_logger.info(f"Request started at {start_time} | {request.method} | {request.url}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        legacy_logger.info(
+            f"Request completed: {request.method} - {request.url} - Status: {response.status_code} - "
+            f"Process Time: {process_time:.2f}s"
+        )
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/healthcheck")
+    def healthcheck():
+        return {"result": "Success"}
+
+    return app
+
+
+def attach_file_handler(logger_name: str, directory: str):
+    handler = RotatingFileHandler(f"{directory}/{logger_name}.log", maxBytes=1024 * 1024 * 5, backupCount=5)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger(logger_name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+async def measure(name: str, app: FastAPI) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://benchmark") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                await client.get("/healthcheck")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(REQUESTS // CONCURRENCY) for _ in range(CONCURRENCY)))
+        rps = REQUESTS / (time.perf_counter() - start)
+
+    print(f"{name:<28} {rps:10,.0f} req/s")
+    return rps
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        attach_file_handler("benchmark.legacy", directory)
+        attach_file_handler("access", directory)
+        legacy = await measure("BaseHTTPMiddleware + sync", build_app(LegacyRequestLoggingMiddleware))
+
+        enable_queue_logging()
+        current = await measure("pure ASGI + QueueListener", build_app(RequestLoggingMiddleware))
+        stop_logging()
+
+    print(f"recovered                    {current - legacy:10,.0f} req/s ({current / legacy - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
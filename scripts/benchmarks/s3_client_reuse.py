@@ -0,0 +1,81 @@
+"""Per-request overhead of the S3 dependency: a boto3 client built and closed for every
+request, as get_aws_s3_client used to do, versus the client shared through
+AWSClientRegistry.
+
+Each simulated request resolves the dependency and deletes an object on a moto S3
+server, so the figures include the connection a fresh client has to open because its
+pool starts empty. Reports wall time and process CPU time per request. Requires moto
+(pip install "moto[server]").
+
+    poetry run python -m scripts.benchmarks.s3_client_reuse 200
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from scripts.benchmarks.s3_upload import MOTO_PORT, wait_for_port
+
+import boto3
+
+from core.config import settings
+from services.aws.aws_client import AWSClient, AWSClientRegistry, AwsServiceEnum
+from services.aws.s3_client import AWSClientS3
+
+FILE_NAME = "benchmark.txt"
+
+
+async def per_request_client():
+    s3_client = AWSClientS3(AWSClient(AwsServiceEnum.S3.value))
+    try:
+        await s3_client.delete_file_from_s3_bucket(FILE_NAME)
+    finally:
+        s3_client.close()
+
+
+async def shared_client():
+    s3_client = AWSClientS3(AWSClientRegistry.get_client(AwsServiceEnum.S3.value))
+    await s3_client.delete_file_from_s3_bucket(FILE_NAME)
+
+
+async def measure(name: str, request, requests: int) -> float:
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(requests):
+        await request()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{name:<20} {wall / requests * 1e3:7.2f} ms/request  {cpu / requests * 1e3:7.2f} ms CPU/request")
+    return wall / requests
+
+
+async def run(requests: int):
+    s3 = boto3.client("s3", region_name=settings.AWS_REGION)
+    s3.create_bucket(Bucket=settings.AWS_BUCKET_NAME)
+
+    # Warm up so botocore's loader cache holds the parsed service model for both paths
+    await per_request_client()
+    await shared_client()
+    before = await measure("client per request", per_request_client, requests)
+    after = await measure("shared client", shared_client, requests)
+    print(f"saved {(before - after) * 1e3:.2f} ms per request ({after / before - 1:+.0%})")
+    AWSClientRegistry.close_all()
+
+
+def main(requests: int):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-p", str(MOTO_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(MOTO_PORT)
+        # boto3 picks the endpoint up from the environment for every client it creates
+        os.environ["AWS_ENDPOINT_URL"] = f"http://127.0.0.1:{MOTO_PORT}"
+        asyncio.run(run(requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,124 @@
+"""Throughput and peak RSS of S3 uploads against a moto S3 server: the previous path
+(body spooled to a temporary file, then upload_fileobj through asyncio.to_thread on
+the default executor) versus streaming multipart parts on the upload executor.
+
+moto runs as its own server process so the objects it keeps in memory do not count
+towards the RSS being measured, and each mode runs in a fresh process so the peak RSS
+figures do not contaminate each other. Requires moto (pip install "moto[server]").
+
+    poetry run python -m scripts.benchmarks.s3_upload 64 16
+"""
+import asyncio
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator
+
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("AWS_BUCKET_NAME", "benchmark")
+
+import boto3
+
+from core.config import settings
+from services.aws.aws_client import AWSClientRegistry, AwsServiceEnum
+from services.aws.s3_client import FOLDER_NAME, AWSClientS3
+
+MOTO_PORT = 5055
+MB = 1024 * 1024
+CHUNK = os.urandom(64 * 1024)
+# What Starlette's form parser uses before rolling a file over to disk
+SPOOL_MAX_SIZE = 1 * MB
+
+
+async def request_body(size: int) -> AsyncIterator[bytes]:
+    """Mimics request.stream(): 64 KiB chunks arriving from the network."""
+    for _ in range(size // len(CHUNK)):
+        yield CHUNK
+        await asyncio.sleep(0)
+
+
+async def legacy_upload(s3, name: str, size: int):
+    spooled = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    async for chunk in request_body(size):
+        spooled.write(chunk)
+    spooled.seek(0)
+    await asyncio.to_thread(s3.upload_fileobj, spooled, settings.AWS_BUCKET_NAME, f"{FOLDER_NAME}/{name}")
+    spooled.close()
+
+
+async def streaming_upload(client: AWSClientS3, name: str, size: int):
+    await client.upload_stream_to_s3_bucket(request_body(size), name)
+
+
+async def run(mode: str, size_mb: int, uploads: int):
+    s3 = boto3.client("s3", region_name=settings.AWS_REGION)
+    if settings.AWS_BUCKET_NAME not in [bucket["Name"] for bucket in s3.list_buckets()["Buckets"]]:
+        s3.create_bucket(Bucket=settings.AWS_BUCKET_NAME)
+    client = AWSClientS3(AWSClientRegistry.get_client(AwsServiceEnum.S3.value))
+    size = size_mb * MB
+
+    async def upload(index: int):
+        name = f"benchmark-{index}.bin"
+        if mode == "legacy":
+            await legacy_upload(s3, name, size)
+        else:
+            await streaming_upload(client, name, size)
+        # moto keeps objects in memory, drop them so the server does not grow unbounded
+        s3.delete_object(Bucket=settings.AWS_BUCKET_NAME, Key=f"{FOLDER_NAME}/{name}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(upload(index) for index in range(uploads)))
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"{mode:<10} {uploads} x {size_mb} MiB  {uploads * size_mb / elapsed:8.1f} MB/s  "
+        f"peak RSS {peak_rss:8.1f} MiB"
+    )
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"moto server did not start on port {port}")
+
+
+def main(size_mb: int, uploads: int):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-p", str(MOTO_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(MOTO_PORT)
+        # boto3 picks the endpoint up from the environment for every client it creates
+        env = {**os.environ, "AWS_ENDPOINT_URL": f"http://127.0.0.1:{MOTO_PORT}"}
+        for mode in ("legacy", "streaming"):
+            subprocess.run(
+                [sys.executable, "-m", "scripts.benchmarks.s3_upload", str(size_mb), str(uploads), mode],
+                check=True,
+                env=env,
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    uploads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    if len(sys.argv) > 3:
+        asyncio.run(run(sys.argv[3], size_mb, uploads))
+    else:
+        main(size_mb, uploads)
@@ -0,0 +1,47 @@
+"""Per-request overhead of resolving the database session dependency.
+
+Compares building a new session factory on every request (the old
+get_database_session_maker behaviour) against the cached async_sessionmaker.
+
+    poetry run python -m scripts.benchmarks.session_maker
+"""
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from db.database import DatabaseSession, get_database_engine, get_database_session_maker
+
+ITERATIONS = 20_000
+
+
+async def uncached_session():
+    engine = get_database_engine().get_engine()
+    session = sessionmaker(bind=engine, class_=AsyncSession, autoflush=False)()
+    await session.close()
+
+
+async def cached_session():
+    async with DatabaseSession(get_database_session_maker()):
+        pass
+
+
+async def measure(name: str, factory) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await factory()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {elapsed / ITERATIONS * 1e6:8.2f} us/request")
+    return elapsed
+
+
+async def main():
+    assert isinstance(get_database_session_maker().get_session_maker(), async_sessionmaker)
+    uncached = await measure("uncached", uncached_session)
+    cached = await measure("cached", cached_session)
+    print(f"saved      {(uncached - cached) / ITERATIONS * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
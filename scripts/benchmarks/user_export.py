@@ -0,0 +1,54 @@
+"""Memory profile of the streaming user export.
+
+Seeds a throwaway database (see database.py) with users and consumes the NDJSON
+export, printing the traced Python heap as rows go by. Peak memory should stay flat as the row count
+grows because only one DB_STREAM_BATCH_SIZE batch is materialised at a time.
+
+    poetry run python -m scripts.benchmarks.user_export 1000000
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import delete, insert
+
+from api.v1.endpoints.user import ExportFormatEnum, export_users_rows
+from db.crud.filters import validate_fields
+from db.crud.user import BULK_INSERT_CHUNK_SIZE
+from db.database import DatabaseSession, get_database_initializer, get_database_session_maker
+from db.models import User
+from scripts.benchmarks.database import use_benchmark_database
+
+
+async def seed(rows: int):
+    async with DatabaseSession(get_database_session_maker()) as session:
+        await session.execute(delete(User))
+        for start in range(0, rows, BULK_INSERT_CHUNK_SIZE):
+            await session.execute(insert(User), [
+                {"username": f"user{i}", "email": f"user{i}@example.com", "is_confirmed": False}
+                for i in range(start, min(start + BULK_INSERT_CHUNK_SIZE, rows))
+            ])
+        await session.commit()
+
+
+async def main(rows: int):
+    use_benchmark_database()
+    await get_database_initializer().initialize_database()
+    await seed(rows)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    exported = 0
+    async for chunk in export_users_rows(ExportFormatEnum.NDJSON, validate_fields(User, None)):
+        exported += chunk.count("\n")
+        if exported % (rows // 10 or 1) < 1000:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{exported:>10} rows  current {current / 2**20:7.2f} MiB  peak {peak / 2**20:7.2f} MiB")
+
+    elapsed = time.perf_counter() - start
+    print(f"exported {exported} rows in {elapsed:.2f}s ({exported / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,161 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, NoReturn, Optional
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Refills continuously at capacity per minute. A capacity of 0 disables the bucket."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        if not self.capacity:
+            return 0.0
+        self.refill()
+        return max(0.0, (min(amount, self.capacity) - self.tokens) / self.rate)
+
+    def consume(self, amount: float):
+        if self.capacity:
+            # May go negative when usage is reconciled, which delays the next callers
+            self.tokens -= amount
+
+
+class AdmissionController:
+    """Admits upstream calls under requests-per-minute and tokens-per-minute budgets and
+    a concurrency cap. Callers wait in a bounded FIFO queue; when the queue is full or
+    the budget can't be met before the deadline they are rejected with a 503 straight
+    away instead of piling up."""
+
+    def __init__(
+            self,
+            requests_per_minute: int,
+            tokens_per_minute: int,
+            max_concurrency: int,
+            max_queue_size: int,
+            max_wait_seconds: float,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+        self.max_wait_seconds = max_wait_seconds
+        self.lock = asyncio.Lock()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.rate_limited = 0
+
+    def reject(self, retry_after: float) -> NoReturn:
+        self.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chat completion service is overloaded, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    async def acquire_before(self, awaitable, deadline: float):
+        try:
+            await asyncio.wait_for(awaitable, timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            self.reject(self.max_wait_seconds)
+
+    async def wait_for_budget(self, estimated_tokens: int, deadline: float):
+        await self.acquire_before(self.lock.acquire(), deadline)
+        try:
+            while True:
+                delay = max(
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(estimated_tokens),
+                    self.blocked_until - time.monotonic(),
+                )
+                if delay <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(estimated_tokens)
+                    return
+                if time.monotonic() + delay > deadline:
+                    self.reject(delay)
+                await asyncio.sleep(delay)
+        finally:
+            self.lock.release()
+
+    @asynccontextmanager
+    async def admit(self, estimated_tokens: int) -> AsyncIterator[None]:
+        if self.waiting >= self.max_queue_size:
+            self.reject(self.max_wait_seconds)
+
+        deadline = time.monotonic() + self.max_wait_seconds
+        self.waiting += 1
+        try:
+            await self.wait_for_budget(estimated_tokens, deadline)
+            await self.acquire_before(self.semaphore.acquire(), deadline)
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+
+    def record_usage(self, estimated_tokens: int, total_tokens: Optional[int]):
+        if total_tokens is not None:
+            self.tokens.consume(total_tokens - estimated_tokens)
+
+    def backoff(self, retry_after: Optional[str]) -> float:
+        """Pauses admissions after an upstream 429, honouring its Retry-After header."""
+        try:
+            seconds = float(retry_after) if retry_after else 1.0
+        except ValueError:
+            seconds = 1.0
+        self.rate_limited += 1
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        logger.warning(f"Upstream rate limit reached, pausing admissions for {seconds:.1f}s")
+        return seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "available_requests": self.requests.tokens if self.requests.capacity else None,
+            "available_tokens": self.tokens.tokens if self.tokens.capacity else None,
+        }
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+        max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        max_queue_size=settings.OPENAI_MAX_QUEUE_SIZE,
+        max_wait_seconds=settings.OPENAI_MAX_QUEUE_WAIT_SECONDS,
+    )
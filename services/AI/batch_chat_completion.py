@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import HTTPException, status
+from httpx import HTTPError
+
+from core.logger import get_logger
+from schemas.AI import ChatCompletionRequest
+from services.AI.interfaces import OpenAIInterface
+
+logger = get_logger(__name__)
+
+
+async def complete_item(
+        chat_completion: OpenAIInterface,
+        index: int,
+        item: ChatCompletionRequest,
+        semaphore: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    """Runs one batch item, turning its failure into an error entry for that item only."""
+    async with semaphore:
+        try:
+            message = await chat_completion.get_model_response(prompt=item.prompt, max_tokens=item.max_tokens)
+            return {"index": index, "message": message}
+        except HTTPException as e:
+            return {"index": index, "error": {"status_code": e.status_code, "detail": e.detail}}
+        except HTTPError as e:
+            logger.error(f"Error generating batch item {index}: {str(e)}")
+            return {"index": index, "error": {"status_code": status.HTTP_502_BAD_GATEWAY, "detail": str(e)}}
+        except Exception as e:
+            logger.error(f"Error generating batch item {index}: {str(e)}")
+            return {"index": index, "error": {"status_code": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": str(e)}}
+
+
+async def complete_batch(
+        chat_completion: OpenAIInterface,
+        items: List[ChatCompletionRequest],
+        max_concurrency: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Fans the items out over the shared client with at most max_concurrency in flight
+    and yields each result as soon as it finishes. Closing the iterator cancels the rest."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.ensure_future(complete_item(chat_completion, index, item, semaphore))
+        for index, item in enumerate(items)
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
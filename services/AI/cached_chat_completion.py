@@ -0,0 +1,89 @@
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+
+from core.config import settings
+from core.logger import get_logger
+from services.AI.chat_bot import ChatCompletion
+from services.AI.interfaces import OpenAIInterface
+from services.cache.cache import InMemoryCache, TieredCache, get_redis_cache
+from services.cache.interfaces import CacheInterface
+from services.cache.single_flight import SingleFlight
+
+logger = get_logger(__name__)
+
+
+class CachedChatCompletion(OpenAIInterface):
+    """Exact-match response cache in front of ChatCompletion.
+
+    Only deterministic (temperature 0) completions are cached. Concurrent misses for
+    the same prompt share a single upstream call.
+    """
+
+    def __init__(self, chat_completion: ChatCompletion, cache: CacheInterface, single_flight: SingleFlight):
+        self.chat_completion = chat_completion
+        self.cache = cache
+        self.single_flight = single_flight
+
+    def cache_key(self, prompt: str, max_tokens: Optional[int]) -> str:
+        normalized = [
+            self.chat_completion.model,
+            " ".join(self.chat_completion.system_role.split()),
+            " ".join(prompt.split()),
+            max_tokens,
+        ]
+        return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+    def is_cacheable(self) -> bool:
+        return self.chat_completion.temperature == 0
+
+    async def get_model_response(self, prompt: str, stream: bool = False, max_tokens: Optional[int] = None):
+        if stream:
+            return self.stream_model_response(prompt, max_tokens=max_tokens)
+        if not self.is_cacheable():
+            return await self.chat_completion.get_model_response(prompt, max_tokens=max_tokens)
+
+        key = self.cache_key(prompt, max_tokens)
+        message = await self.cache.get(key)
+        if message is not None:
+            return message
+
+        async def fetch():
+            result = await self.chat_completion.get_model_response(prompt, max_tokens=max_tokens)
+            await self.cache.set(key, result)
+            return result
+
+        return await self.single_flight.do(key, fetch)
+
+    async def stream_model_response(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        message = await self.cache.get(self.cache_key(prompt, max_tokens)) if self.is_cacheable() else None
+        if message is not None:
+            yield message["content"]
+            return
+
+        deltas = self.chat_completion.stream_model_response(prompt, max_tokens=max_tokens)
+        try:
+            async for content in deltas:
+                yield content
+        finally:
+            await deltas.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "single_flight": self.single_flight.stats()}
+
+
+@lru_cache
+def get_chat_completion_cache() -> CacheInterface:
+    return TieredCache(
+        local=InMemoryCache(
+            max_entries=settings.CHAT_COMPLETION_CACHE_MAX_ENTRIES,
+            ttl=settings.CHAT_COMPLETION_CACHE_TTL_SECONDS,
+        ),
+        shared=get_redis_cache(prefix="chat", ttl=settings.CHAT_COMPLETION_CACHE_TTL_SECONDS),
+    )
+
+
+@lru_cache
+def get_chat_completion_single_flight() -> SingleFlight:
+    return SingleFlight()
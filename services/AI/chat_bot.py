@@ -2,11 +2,17 @@ from openai import OpenAI, APIError
 from openai.types.chat import ChatCompletionMessage
 from openai import APIError
 from fastapi import HTTPException, status
-from typing import AsyncGenerator
+from typing import AsyncGenerator, AsyncIterator, Optional
+from contextlib import asynccontextmanager
+from httpx import HTTPStatusError
+import json
+import time
 from core.logger import get_logger
 from core.config import settings
 from services.http.http_client import HttpClient
 from services.AI.interfaces import OpenAIInterface
+from services.AI.admission_controller import AdmissionController
+from core.metrics import openai_request_duration, openai_time_to_first_token
 
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
@@ -20,32 +26,85 @@ headers = {
 
 
 class ChatCompletion(OpenAIInterface):
-    def __init__(self, http_client: HttpClient):
+    def __init__(self, http_client: HttpClient, admission_controller: Optional[AdmissionController] = None):
         self.http_client = http_client
+        self.admission_controller = admission_controller
         self.base_url = settings.OPENAI_HTTP_URL
         self.api_key = settings.OPENAI_API_KEY
         self.model = settings.CHAT_COMPLETION_MODEL
         self.temperature = 0
         self.system_role = "You are a helpful and friendly assistant."
         self.headers = {"Authorization": f"Bearer {self.api_key}"}
+        self.time_to_first_token: Optional[float] = None
+
+    def estimate_tokens(self, prompt: str, max_tokens: Optional[int] = None) -> int:
+        """Rough upper bound used for the tokens-per-minute budget (~4 characters per token)."""
+        prompt_tokens = (len(self.system_role) + len(prompt)) // 4
+        return prompt_tokens + (max_tokens or settings.OPENAI_DEFAULT_COMPLETION_TOKENS)
+
+    @asynccontextmanager
+    async def observe_upstream(self, operation: str) -> AsyncIterator[None]:
+        """Records the upstream latency, excluding time spent waiting for admission."""
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            openai_request_duration.observe(time.perf_counter() - start_time, operation, outcome)
+
+    @asynccontextmanager
+    async def admit(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[int]:
+        """Waits for the admission controller, if any, and turns upstream 429s into 503s
+        while pausing further admissions for the upstream Retry-After."""
+        estimated_tokens = self.estimate_tokens(prompt, max_tokens)
+        if self.admission_controller is None:
+            yield estimated_tokens
+            return
+
+        async with self.admission_controller.admit(estimated_tokens):
+            try:
+                yield estimated_tokens
+            except HTTPStatusError as e:
+                if e.response.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+                    raise
+                retry_after = self.admission_controller.backoff(e.response.headers.get("Retry-After"))
+                self.admission_controller.reject(retry_after)
+
+    def build_request_data(self, prompt: str, max_tokens: Optional[int] = None, **kwargs) -> dict:
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_role},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": self.temperature,
+            **kwargs,
+        }
+        if max_tokens is not None:
+            data["max_tokens"] = max_tokens
+        return data
+
+    async def get_model_response(self, prompt: str, stream: bool = False, max_tokens: Optional[int] = None):
+        """Fetch chat completion response from OpenAI API. With stream=True the content
+        deltas are returned as an async iterator instead."""
+        if stream:
+            return self.stream_model_response(prompt, max_tokens=max_tokens)
 
-    async def get_model_response(self, prompt: str) -> dict:
-        """Fetch chat completion response from OpenAI API."""
         try:
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self.system_role},
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": self.temperature,
-            }
-
-            result = await self.http_client.post_request(
-                url=f"{self.base_url}/chat/completions",
-                data=data,
-                custom_headers=self.headers
-            )
+            data = self.build_request_data(prompt, max_tokens=max_tokens)
+
+            async with self.admit(prompt, max_tokens) as estimated_tokens:
+                async with self.observe_upstream("chat_completion"):
+                    result = await self.http_client.post_request(
+                        url=f"{self.base_url}/chat/completions",
+                        data=data,
+                        custom_headers=self.headers
+                    )
+
+            if self.admission_controller is not None:
+                usage = result.get("usage") or {}
+                self.admission_controller.record_usage(estimated_tokens, usage.get("total_tokens"))
 
             return result["choices"][0]["message"]
         except APIError as e:
@@ -55,6 +114,43 @@ class ChatCompletion(OpenAIInterface):
                 detail=f"There was an error generating message: {str(e)}"
             )
 
+    async def stream_model_response(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        """Streams content deltas from the OpenAI API, parsing the SSE lines as they arrive."""
+        start_time = time.monotonic()
+        self.time_to_first_token = None
+
+        async with self.admit(prompt, max_tokens), self.observe_upstream("chat_completion_stream"):
+            lines = self.http_client.stream_post_request(
+                url=f"{self.base_url}/chat/completions",
+                data=self.build_request_data(prompt, max_tokens=max_tokens, stream=True),
+                custom_headers=self.headers
+            )
+            try:
+                async for line in lines:
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+
+                    try:
+                        choices = json.loads(payload).get("choices") or [{}]
+                    except json.JSONDecodeError as e:
+                        # A bad or keep-alive data line should not end the whole stream
+                        logger.warning(f"Skipping malformed chat completion stream line {payload[:200]!r}: {str(e)}")
+                        continue
+                    content = choices[0].get("delta", {}).get("content")
+                    if not content:
+                        continue
+
+                    if self.time_to_first_token is None:
+                        self.time_to_first_token = time.monotonic() - start_time
+                        openai_time_to_first_token.observe(self.time_to_first_token)
+                        logger.info(f"Chat completion time to first token: {self.time_to_first_token:.3f}s")
+                    yield content
+            finally:
+                await lines.aclose()
+
 
 def get_chat_completion_service() -> AsyncGenerator[OpenAIInterface, None]:
     try:
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
 from openai.types.chat import ChatCompletionMessage
 
 
 class OpenAIInterface(ABC):
     @abstractmethod
-    async def get_model_response(self, prompt: str) -> ChatCompletionMessage:
+    async def get_model_response(
+            self, prompt: str, stream: bool = False, max_tokens: Optional[int] = None
+    ) -> ChatCompletionMessage:
         pass
 
+    @abstractmethod
+    def stream_model_response(self, prompt: str, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        pass
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from enum import Enum
 from asyncio import to_thread
-from typing import Optional, AsyncGenerator
+from typing import Dict, Optional, AsyncGenerator
+import threading
 from fastapi import UploadFile, HTTPException
 from fastapi.responses import StreamingResponse
 import mimetypes
 from boto3 import client
+from boto3.session import Session
 from boto3.exceptions import Boto3Error
 from botocore.config import Config
 from core.config import settings
@@ -34,13 +36,16 @@ class AWSClientInterface(ABC):
 
 
 class AWSClient(AWSClientInterface):
-    def __init__(self, service: str):
-        self.__client = client(
+    def __init__(self, service: str, session: Optional[Session] = None, max_pool_connections: Optional[int] = None):
+        config = Config(retries={"max_attempts": 3, "mode": "standard"})
+        if max_pool_connections is not None:
+            config = config.merge(Config(max_pool_connections=max_pool_connections))
+        self.__client = (session.client if session else client)(
             service,
             region_name=settings.AWS_REGION,
             aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            config=Config(retries={"max_attempts": 3, "mode": "standard"})
+            config=config
         )
 
     def get_client(self):
@@ -48,3 +53,42 @@ class AWSClient(AWSClientInterface):
 
     def close(self):
         self.__client.close()
+
+
+class AWSClientRegistry:
+    """Holds one AWSClient per service for the whole process. Building a boto3 client
+    loads the service model and costs tens of milliseconds of CPU, and each client owns
+    its connection pool, so requests borrow these instead of building their own.
+
+    boto3 clients are thread-safe once built, sessions are not, so clients are built
+    under a lock from a session owned by the registry. Opened and closed by the
+    application lifespan."""
+    _clients: Dict[str, AWSClient] = {}
+    _session: Optional[Session] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, service: str) -> AWSClient:
+        aws_client = cls._clients.get(service)
+        if aws_client is None:
+            with cls._lock:
+                aws_client = cls._clients.get(service)
+                if aws_client is None:
+                    if cls._session is None:
+                        cls._session = Session()
+                    aws_client = AWSClient(
+                        service, session=cls._session, max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS
+                    )
+                    cls._clients[service] = aws_client
+                    logger.debug(f"Created shared {service} client")
+        return aws_client
+
+    @classmethod
+    def close_all(cls):
+        """Closes the connection pools of every client. Clients requested afterwards are
+        built again, so a restarted lifespan still works."""
+        with cls._lock:
+            for aws_client in cls._clients.values():
+                aws_client.close()
+            cls._clients = {}
+            cls._session = None
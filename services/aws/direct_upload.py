@@ -0,0 +1,114 @@
+import math
+from typing import Dict
+from uuid import uuid4
+
+from fastapi import HTTPException, status
+
+from core.config import settings
+from core.logger import get_logger
+from db.crud.file_upload import FileUploadRepository
+from schemas.file_schema import CompleteUploadRequest, DirectUploadRequest
+from services.aws.executor import MB
+from services.aws.s3_client import FOLDER_NAME, AWSClientS3Interface
+
+logger = get_logger(__name__)
+# S3 limits a multipart upload to 10,000 parts
+MAX_PARTS = 10_000
+
+
+class DirectUploadService:
+    """Clients upload straight to S3 with presigned requests, the API only hands out the
+    URLs and checks the object afterwards. A worker is busy for two short control
+    requests instead of the whole transfer."""
+
+    def __init__(self, s3_client: AWSClientS3Interface, repository: FileUploadRepository):
+        self.s3_client = s3_client
+        self.repository = repository
+
+    async def create(self, request: DirectUploadRequest) -> Dict:
+        if request.size > settings.DIRECT_UPLOAD_MAX_SIZE_MB * MB:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                detail=f"Uploads are limited to {settings.DIRECT_UPLOAD_MAX_SIZE_MB} MB",
+            )
+        allowed = settings.DIRECT_UPLOAD_ALLOWED_CONTENT_TYPES
+        if allowed and not request.content_type.startswith(tuple(allowed)):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Content type '{request.content_type}' is not allowed",
+            )
+
+        # Unique per upload so clients never overwrite each other's objects
+        file_name = f"{uuid4().hex}-{request.file_name}"
+        key = f"{FOLDER_NAME}/{file_name}"
+        expiration = settings.DIRECT_UPLOAD_EXPIRATION_SECONDS
+
+        if request.size <= settings.DIRECT_UPLOAD_MULTIPART_THRESHOLD_MB * MB:
+            post = await self.s3_client.create_presigned_post(
+                file_name, request.content_type, request.size, expiration=expiration,
+            )
+            upload = await self.repository.create_one(key, file_name, request.content_type, request.size)
+            return {
+                "id": upload["id"],
+                "file_name": file_name,
+                "method": "post",
+                "url": post["url"],
+                "fields": post["fields"],
+                "expires_in": expiration,
+            }
+
+        part_size = max(settings.DIRECT_UPLOAD_PART_SIZE_MB * MB, math.ceil(request.size / MAX_PARTS))
+        multipart = await self.s3_client.create_presigned_multipart_upload(
+            file_name, request.content_type, math.ceil(request.size / part_size), expiration=expiration,
+        )
+        upload = await self.repository.create_one(
+            key, file_name, request.content_type, request.size, upload_id=multipart["upload_id"],
+        )
+        return {
+            "id": upload["id"],
+            "file_name": file_name,
+            "method": "multipart",
+            "part_size": part_size,
+            "urls": multipart["urls"],
+            "expires_in": expiration,
+        }
+
+    async def complete(self, upload_id: int, request: CompleteUploadRequest) -> Dict:
+        """Checks the uploaded object against what was declared and records its size and
+        ETag. Safe to retry: an upload that was already checked is returned as is. The row
+        is locked until its status is written, so a concurrent complete waits and then
+        finds it completed rather than completing the multipart upload a second time."""
+        upload = await self.repository.find_unique(upload_id, for_update=True)
+        if upload.status != "pending":
+            return upload.to_dict()
+
+        if upload.upload_id:
+            if not request.parts:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Multipart uploads need the part numbers and ETags to complete",
+                )
+            await self.s3_client.complete_multipart_upload(
+                upload.file_name,
+                upload.upload_id,
+                [{"PartNumber": part.part_number, "ETag": part.etag} for part in request.parts],
+            )
+
+        metadata = await self.s3_client.get_file_metadata(upload.file_name)
+        if metadata is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The file has not been uploaded yet")
+
+        # A presigned POST policy already enforces both, multipart part URLs cannot
+        if metadata["size"] > upload.max_size or metadata["content_type"] != upload.content_type:
+            logger.warning(
+                f"Rejected upload {upload.id}: {metadata['size']} bytes of '{metadata['content_type']}', "
+                f"declared {upload.max_size} bytes of '{upload.content_type}'"
+            )
+            await self.s3_client.delete_file_from_s3_bucket(upload.file_name)
+            await self.repository.set_status(upload, "rejected", metadata["size"], metadata["etag"])
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="The uploaded file does not match the declared size or content type",
+            )
+
+        return await self.repository.set_status(upload, "completed", metadata["size"], metadata["etag"])
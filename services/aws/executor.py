@@ -0,0 +1,122 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from boto3.s3.transfer import TransferConfig
+
+from core.config import settings
+
+MB = 1024 * 1024
+# S3 rejects multipart parts smaller than 5 MiB, except the last one
+MIN_MULTIPART_CHUNKSIZE = 5 * MB
+
+
+class BoundedExecutor:
+    """Dedicated thread pool for blocking boto3 calls.
+
+    Keeps S3 transfers off the default executor, which FastAPI and asyncio.to_thread
+    share with everything else. No more than max_workers calls are handed to the pool;
+    further callers wait on the event loop instead of queueing work inside the pool.
+    Slots only cover the S3 call itself, callers prepare their data before asking for
+    one.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.slots = asyncio.Semaphore(max_workers)
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # A running thread cannot be interrupted. The slot is held until it returns,
+                # so in_flight matches the busy threads and the caller can safely clean up
+                # whatever the call was using once the cancellation reaches it.
+                await asyncio.wait([future])
+                raise
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class BufferBudget:
+    """Caps the bytes of request bodies held in memory across all streaming uploads.
+    Space is reserved before a part is read from the client and returned once S3 has
+    it, so the number of slow clients does not matter for the executor, only for how
+    much of this budget they sit on. Callers waiting on a client must reserve all they
+    need in one acquire, holding part of it while waiting for more can deadlock."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self.waiting = 0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self, size: int):
+        async with self.condition:
+            self.waiting += 1
+            try:
+                # A reservation larger than the whole budget still goes through on its own
+                await self.condition.wait_for(lambda: self.used == 0 or self.used + size <= self.limit)
+            finally:
+                self.waiting -= 1
+            self.used += size
+
+    async def release(self, size: int):
+        if size <= 0:
+            return
+        async with self.condition:
+            self.used -= size
+            self.condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "used": self.used, "waiting": self.waiting}
+
+
+@lru_cache
+def get_upload_executor() -> BoundedExecutor:
+    return BoundedExecutor(max_workers=settings.S3_UPLOAD_MAX_WORKERS, name="s3-upload")
+
+
+@lru_cache
+def get_upload_buffer_budget() -> BufferBudget:
+    return BufferBudget(limit=settings.S3_UPLOAD_MAX_BUFFERED_MB * MB)
+
+
+@lru_cache
+def get_download_executor() -> BoundedExecutor:
+    return BoundedExecutor(max_workers=settings.S3_DOWNLOAD_MAX_WORKERS, name="s3-download")
+
+
+@lru_cache
+def get_transfer_config() -> TransferConfig:
+    return TransferConfig(
+        multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+        multipart_chunksize=max(settings.S3_MULTIPART_CHUNKSIZE_MB * MB, MIN_MULTIPART_CHUNKSIZE),
+        max_concurrency=settings.S3_MULTIPART_MAX_CONCURRENCY,
+    )
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.logger import get_logger
+from services.cache.interfaces import CacheInterface
+
+logger = get_logger(__name__)
+
+
+class InMemoryCache(CacheInterface):
+    """In-process LRU cache whose entries also expire after a TTL."""
+
+    def __init__(self, max_entries: int = 10_000, ttl: int = 60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self.entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "max_entries": self.max_entries,
+        }
+
+    async def close(self):
+        self.entries.clear()
+
+
+class RedisCache(CacheInterface):
+    """Shared cache tier backed by Redis. Values are stored as JSON and any Redis error
+    is treated as a miss so the database stays the source of truth."""
+
+    def __init__(self, redis_client, ttl: int = 60, prefix: str = "cache"):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            value = await self.redis.get(self._key(key))
+        except Exception as e:
+            logger.error(f"Error reading from Redis cache: {str(e)}")
+            self.errors += 1
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        try:
+            await self.redis.set(self._key(key), json.dumps(value), ex=ttl or self.ttl)
+        except Exception as e:
+            logger.error(f"Error writing to Redis cache: {str(e)}")
+            self.errors += 1
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        try:
+            await self.redis.delete(*(self._key(key) for key in keys))
+        except Exception as e:
+            logger.error(f"Error deleting from Redis cache: {str(e)}")
+            self.errors += 1
+
+    async def publish(self, channel: str, keys: List[str]):
+        try:
+            await self.redis.publish(self._key(channel), json.dumps(keys))
+        except Exception as e:
+            logger.error(f"Error publishing to Redis channel {channel}: {str(e)}")
+            self.errors += 1
+
+    async def subscribe(self, channel: str) -> AsyncIterator[List[str]]:
+        """Yields the keys of every message published on channel until cancelled."""
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self._key(channel))
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class TieredCache(CacheInterface):
+    """Reads the in-process tier first, then the shared tier, promoting shared hits.
+
+    With an invalidation channel, deletes are broadcast over Redis pub/sub so every
+    worker drops the keys from its own in-process tier, not only the one that handled
+    the write. Pub/sub delivery is best effort, a message missed while a worker was
+    reconnecting leaves its copy stale until the in-process TTL expires.
+    """
+
+    def __init__(self, local: CacheInterface, shared: Optional[CacheInterface] = None, channel: Optional[str] = None):
+        self.local = local
+        self.shared = shared
+        self.channel = channel if isinstance(shared, RedisCache) else None
+        self.listener: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(key)
+            if value is not None:
+                await self.local.set(key, value)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        await self.local.set(key, value, ttl)
+        if self.shared is not None:
+            await self.shared.set(key, value, ttl)
+
+    async def delete(self, *keys: str):
+        await self.local.delete(*keys)
+        if self.shared is not None:
+            await self.shared.delete(*keys)
+        if self.channel is not None and keys:
+            await self.shared.publish(self.channel, list(keys))
+
+    def start(self):
+        """Starts listening for invalidations from other workers, a no-op without a channel."""
+        if self.channel is not None and self.listener is None:
+            self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            try:
+                async for keys in self.shared.subscribe(self.channel):
+                    await self.local.delete(*keys)
+                    self.invalidations += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Invalidation listener on {self.channel} failed, resubscribing: {str(e)}")
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "local": self.local.stats(),
+            "invalidations": self.invalidations,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+    async def close(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+            self.listener = None
+        await self.local.close()
+        if self.shared is not None:
+            await self.shared.close()
+
+
+def get_redis_cache(prefix: str, ttl: Optional[int] = None) -> Optional[RedisCache]:
+    if not settings.REDIS_URL:
+        return None
+    try:
+        from redis import asyncio as redis_asyncio
+    except ImportError:
+        logger.warning("REDIS_URL is set but the 'redis' package is not installed, using the in-process cache only")
+        return None
+
+    return RedisCache(
+        redis_asyncio.from_url(settings.REDIS_URL),
+        ttl=ttl or settings.CACHE_TTL_SECONDS,
+        prefix=prefix,
+    )
+
+
+@lru_cache
+def get_user_cache() -> TieredCache:
+    shared = get_redis_cache(prefix="user")
+    # With Redis the in-process copy is only a short-lived read buffer, invalidations
+    # are broadcast and CACHE_LOCAL_TTL_SECONDS bounds staleness if one is missed
+    local_ttl = settings.CACHE_LOCAL_TTL_SECONDS if shared is not None else settings.CACHE_TTL_SECONDS
+    return TieredCache(
+        local=InMemoryCache(max_entries=settings.CACHE_MAX_ENTRIES, ttl=local_ttl),
+        shared=shared,
+        channel="invalidate",
+    )
@@ -0,0 +1,50 @@
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict
+
+from core.config import settings
+from services.cache.cache import InMemoryCache, TieredCache, get_redis_cache
+from services.cache.interfaces import CacheInterface
+from services.cache.single_flight import SingleFlight
+
+
+class IdempotencyStore:
+    """Remembers the result of a request by its Idempotency-Key so a client retry gets
+    the original response back instead of executing the write again. Retries that race
+    the original request wait for it rather than running alongside it. Failures are
+    not stored, so a failed request can be retried with the same key."""
+
+    def __init__(self, cache: CacheInterface, single_flight: SingleFlight):
+        self.cache = cache
+        self.single_flight = single_flight
+        self.replays = 0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        result = await self.cache.get(key)
+        if result is not None:
+            self.replays += 1
+            return result
+
+        async def execute():
+            value = await fn()
+            await self.cache.set(key, value)
+            return value
+
+        return await self.single_flight.do(key, execute)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "replays": self.replays, "single_flight": self.single_flight.stats()}
+
+    async def close(self):
+        await self.cache.close()
+
+
+@lru_cache
+def get_idempotency_store() -> IdempotencyStore:
+    cache = TieredCache(
+        local=InMemoryCache(
+            max_entries=settings.IDEMPOTENCY_CACHE_MAX_ENTRIES,
+            ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+        ),
+        shared=get_redis_cache(prefix="idempotency", ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    )
+    return IdempotencyStore(cache, SingleFlight())
@@ -1,13 +1,19 @@
 from json import JSONDecodeError
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from core.config import settings
 from core.logger import get_logger
-from httpx import AsyncClient, HTTPStatusError, Timeout, Limits, RequestError, Response
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
-from typing import Dict, Any, Optional, AsyncGenerator
+from core.metrics import registry
+from httpx import AsyncClient, AsyncHTTPTransport, HTTPStatusError, Timeout, Limits, RequestError, Response
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from typing import Dict, Any, Optional, AsyncGenerator, AsyncIterator, Iterator
 from abc import ABC, abstractmethod
 from fastapi import HTTPException, status
 
 logger = get_logger(__name__)
 
+http_client_requests = registry.counter("http_client_requests_total", "Requests sent through the shared HTTP client")
+
 
 class HttpClientInterface(ABC):
     @property
@@ -27,13 +33,26 @@ class HttpClientInterface(ABC):
     async def get_request(self):
         pass
 
+    @abstractmethod
+    def stream_post_request(self):
+        pass
+
 
 class RetryDecoratorWrapper:
+    @staticmethod
+    def is_retryable(exception: BaseException) -> bool:
+        """Retries transport errors and 5xx responses. 4xx responses, 429 included, are
+        returned to the caller so rate limits are not multiplied by retries."""
+        if isinstance(exception, HTTPStatusError):
+            return exception.response.status_code >= 500
+        return isinstance(exception, RequestError)
+
     @staticmethod
     def get_retry_decorator():
         """Returns a retry decorator with a consistent retry strategy."""
         return retry(
-            retry=retry_if_exception_type((HTTPStatusError, RequestError)),
+            retry=retry_if_exception(RetryDecoratorWrapper.is_retryable),
+            reraise=True,
             wait=wait_exponential(multiplier=1, min=1, max=10),
             stop=stop_after_attempt(3)
         )
@@ -44,10 +63,65 @@ class HttpClient(HttpClientInterface, ABC):
         # self.async_client = client or AsyncClient(timeout=Timeout(10.0), limits=Limits(max_connections=10))
         self.async_client = client
         self.common_headers = {"Content-Type": "application/json"}
+        self.in_flight_requests = 0
+        self.peak_in_flight_requests = 0
+        self.total_requests = 0
 
     def client(self):
         return self.async_client
 
+    @contextmanager
+    def track_request(self) -> Iterator[None]:
+        """Keeps count of the requests currently waiting on the connection pool."""
+        self.in_flight_requests += 1
+        self.total_requests += 1
+        http_client_requests.inc()
+        self.peak_in_flight_requests = max(self.peak_in_flight_requests, self.in_flight_requests)
+        try:
+            yield
+        finally:
+            self.in_flight_requests -= 1
+
+    def pool_connections(self) -> Optional[list]:
+        """Connections of every pool of the shared AsyncClient. httpx does not expose its
+        pools, so this reads private attributes and returns None if their layout changed
+        rather than failing the healthcheck and /metrics."""
+        try:
+            transports = [self.async_client._transport, *self.async_client._mounts.values()]
+            connections = []
+            for transport in transports:
+                pool = getattr(transport, "_pool", None)
+                connections += list(getattr(pool, "connections", []))
+            # Touched here so a missing is_idle() is caught as well
+            for connection in connections:
+                connection.is_idle()
+            return connections
+        except Exception as e:
+            logger.debug(f"HTTP client pool is not inspectable: {str(e)}")
+            return None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Returns connection pool occupancy for the shared AsyncClient."""
+        stats = {
+            "max_connections": settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            "in_flight_requests": self.in_flight_requests,
+            "peak_in_flight_requests": self.peak_in_flight_requests,
+            "total_requests": self.total_requests,
+        }
+
+        connections = self.pool_connections()
+        if connections is not None:
+            idle = sum(1 for connection in connections if connection.is_idle())
+            active = len(connections) - idle
+            stats.update({
+                "connections": len(connections),
+                "active_connections": active,
+                "idle_connections": idle,
+                "queued_requests": max(0, self.in_flight_requests - active),
+            })
+        return stats
+
     async def handle_response(self, response: Response) -> Any:
         """Handles common response processing and error logging."""
         try:
@@ -69,20 +143,16 @@ class HttpClient(HttpClientInterface, ABC):
             custom_headers: Optional[Dict[str, str]] = {},
     ) -> Any:
         """Sends a POST request with retries."""
-        try:
-            async with self.async_client as http_client:
-                response = await http_client.post(
-                    url=url,
-                    json=data,
-                    headers={
-                        **self.common_headers,
-                        **custom_headers,
-                    }
-                )
-                return await self.handle_response(response)
-        finally:
-            if isinstance(self.async_client, AsyncClient):
-                await self.async_client.aclose()
+        with self.track_request():
+            response = await self.async_client.post(
+                url=url,
+                json=data,
+                headers={
+                    **self.common_headers,
+                    **custom_headers,
+                }
+            )
+        return await self.handle_response(response)
 
     @RetryDecoratorWrapper.get_retry_decorator()
     async def get_request(
@@ -91,34 +161,83 @@ class HttpClient(HttpClientInterface, ABC):
             custom_headers: Optional[Dict[str, str]] = {},
     ) -> Any:
         """Sends a GET request with retries."""
-        try:
-            async with self.async_client as http_client:
-                response = await http_client.get(
-                    url,
-                    headers={
-                        **self.common_headers,
-                        **custom_headers,
-                    }
-                )
-                return await self.handle_response(response)
-        finally:
-            if isinstance(self.async_client, AsyncClient):
-                await self.async_client.aclose()
+        with self.track_request():
+            response = await self.async_client.get(
+                url,
+                headers={
+                    **self.common_headers,
+                    **custom_headers,
+                }
+            )
+        return await self.handle_response(response)
+
+    async def stream_post_request(
+            self,
+            url: str,
+            data: Dict[str, Any],
+            custom_headers: Optional[Dict[str, str]] = {},
+    ) -> AsyncIterator[str]:
+        """Sends a POST request and yields the response body line by line as it arrives.
+        Closing the generator closes the upstream response."""
+        with self.track_request():
+            async with self.async_client.stream(
+                "POST",
+                url,
+                json=data,
+                headers={
+                    **self.common_headers,
+                    **custom_headers,
+                }
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    yield line
+
+
+def build_transport(max_keepalive_connections: int, http2: bool = False) -> AsyncHTTPTransport:
+    return AsyncHTTPTransport(
+        http2=http2,
+        limits=Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+    )
 
 
 class HttpClientSingleton:
     """Ensures that only one instance of HttpClient and its underlying AsyncClient is
-    created and reused across the application"""
+    created and reused across the application. The client is opened and closed by the
+    application lifespan, requests only borrow it."""
     _instance: Optional[HttpClient] = None
     _async_client: Optional[AsyncClient] = None
 
+    @staticmethod
+    def http2_enabled() -> bool:
+        if not settings.HTTP_CLIENT_HTTP2:
+            return False
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("HTTP_CLIENT_HTTP2 is enabled but the 'h2' package is not installed, using HTTP/1.1")
+            return False
+
     @classmethod
     def get_instance(cls) -> HttpClient:
         if cls._instance is None:
             if cls._async_client is None:
+                http2 = cls.http2_enabled()
+                mounts = {
+                    f"all://{urlsplit(host).hostname or host}": build_transport(keepalive, http2)
+                    for host, keepalive in settings.HTTP_CLIENT_HOST_KEEPALIVE.items()
+                }
                 cls._async_client = AsyncClient(
-                    timeout=Timeout(30.0),
-                    limits=Limits(max_connections=100, max_keepalive_connections=10),
+                    timeout=Timeout(settings.HTTP_CLIENT_TIMEOUT),
+                    transport=build_transport(settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS, http2),
+                    mounts=mounts,
                 )
             cls._instance = HttpClient(client=cls._async_client)
         return cls._instance
@@ -139,5 +258,20 @@ async def get_http_client() -> AsyncGenerator[HttpClient, None]:
     except HTTPStatusError as e:
         logger.error(f"{str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{str(e)}")
-    finally:
-        await HttpClientSingleton.close_instance()
+
+
+def get_http_client_pool_status() -> dict:
+    if HttpClientSingleton._instance is None:
+        return {}
+    stats = HttpClientSingleton._instance.pool_stats()
+    # Monotonic, exported as the http_client_requests_total counter instead
+    stats.pop("total_requests")
+    return {(state,): value for state, value in stats.items()}
+
+
+registry.gauge(
+    "http_client_pool",
+    "Shared HTTP client connection pool usage",
+    get_http_client_pool_status,
+    ("state",),
+)
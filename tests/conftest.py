@@ -0,0 +1,18 @@
+import os
+
+# Settings are read at import time, these have to be set before the app is imported
+os.environ.setdefault("ENVIRONMENT", "production")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ASYNC_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("AWS_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+os.environ.setdefault("AWS_BUCKET_NAME", "test-bucket")
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
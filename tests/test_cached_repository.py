@@ -0,0 +1,151 @@
+import asyncio
+from typing import Dict, Optional
+
+import fakeredis
+import pytest
+
+from db.crud.cached_repository import CachedRepository
+from db.interfaces import DataBaseRepositoryInterface
+from services.cache.cache import InMemoryCache, RedisCache, TieredCache
+
+pytestmark = pytest.mark.anyio
+
+
+class Record:
+    def __init__(self, values: Dict):
+        self.values = values
+        self.id = values["id"]
+
+    def to_dict(self) -> Dict:
+        return dict(self.values)
+
+
+class FakeUserRepository(DataBaseRepositoryInterface):
+    def __init__(self):
+        super().__init__(session=None)
+        self.users = {1: {"id": 1, "email": "ada@example.com", "username": "ada"}}
+        self.lookups = 0
+
+    async def find_unique(self, **kwargs):
+        self.lookups += 1
+        for user in self.users.values():
+            if all(user[field] == value for field, value in kwargs.items()):
+                return Record(user)
+
+    async def update_one(self, resource):
+        self.users[resource["id"]].update(resource)
+        return Record(self.users[resource["id"]])
+
+    async def create_one(self, resource):
+        self.users[resource["id"]] = resource
+        return resource
+
+    async def get_all(self, limit: int = 0, offset: int = 0):
+        pass
+
+    async def get_page(self, limit: int = 50, cursor: Optional[str] = None, fields: Optional[list] = None, **kwargs):
+        pass
+
+    def stream_all(self, fields: Optional[list] = None, batch_size: int = 1000):
+        pass
+
+    async def find_many(self, **kwargs):
+        pass
+
+    async def find_by_query(self, name: str, params: Optional[dict] = None):
+        pass
+
+    async def create_many(self, resources: list):
+        pass
+
+
+def tiered_cache(server: fakeredis.FakeServer) -> TieredCache:
+    """One worker's cache, workers built from the same server share the Redis tier."""
+    redis = fakeredis.FakeAsyncRedis(server=server)
+    return TieredCache(
+        local=InMemoryCache(max_entries=100, ttl=60),
+        shared=RedisCache(redis, ttl=60, prefix="user"),
+        channel="invalidate",
+    )
+
+
+async def wait_for(condition, timeout: float = 1.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def test_miss_then_hit_from_both_tiers():
+    server = fakeredis.FakeServer()
+    repository = FakeUserRepository()
+    worker = tiered_cache(server)
+    other_worker = tiered_cache(server)
+
+    first = await CachedRepository(repository, worker, namespace="user").find_unique(id=1)
+    assert first["email"] == "ada@example.com"
+    assert repository.lookups == 1
+    assert worker.stats()["misses"] == 1
+
+    # Local tier of the same worker
+    await CachedRepository(repository, worker, namespace="user").find_unique(id=1)
+    assert worker.stats()["local"]["hits"] == 1
+
+    # Shared tier from another worker, promoted to its local tier
+    other = await CachedRepository(repository, other_worker, namespace="user").find_unique(id=1)
+    assert other == first
+    assert repository.lookups == 1
+    assert other_worker.stats()["shared"]["hits"] == 1
+    assert await other_worker.local.get("user:id=1") == first
+
+    await worker.close()
+    await other_worker.close()
+
+
+async def test_lookup_by_other_field_is_cached_by_id():
+    repository = FakeUserRepository()
+    cache = tiered_cache(fakeredis.FakeServer())
+    cached = CachedRepository(repository, cache, namespace="user")
+
+    await cached.find_unique(email="ada@example.com")
+    assert await cached.find_unique(email="ada@example.com") == await cached.find_unique(id=1)
+    assert repository.lookups == 1
+
+    await cache.close()
+
+
+async def test_update_invalidates_both_tiers_on_every_worker():
+    server = fakeredis.FakeServer()
+    repository = FakeUserRepository()
+    worker = tiered_cache(server)
+    other_worker = tiered_cache(server)
+    worker.start()
+    other_worker.start()
+    # Let both listeners subscribe before anything is published
+    await asyncio.sleep(0.05)
+
+    await CachedRepository(repository, worker, namespace="user").find_unique(id=1)
+    await CachedRepository(repository, other_worker, namespace="user").find_unique(id=1)
+    assert await other_worker.local.get("user:id=1") is not None
+
+    await CachedRepository(repository, worker, namespace="user").update_one({"id": 1, "username": "lovelace"})
+
+    assert await worker.local.get("user:id=1") is None
+    assert await worker.shared.get("user:id=1") is None
+    await wait_for(lambda: other_worker.invalidations == 1)
+    assert await other_worker.local.get("user:id=1") is None
+
+    updated = await CachedRepository(repository, other_worker, namespace="user").find_unique(id=1)
+    assert updated["username"] == "lovelace"
+    assert repository.lookups == 2
+
+    await worker.close()
+    await other_worker.close()
+
+
+async def test_without_shared_tier_no_listener_is_started():
+    cache = TieredCache(local=InMemoryCache(), channel="invalidate")
+    cache.start()
+    assert cache.listener is None
+    await cache.delete("user:id=1")
+    await cache.close()
@@ -0,0 +1,109 @@
+import asyncio
+from typing import List
+
+import httpx
+import pytest
+
+from api.v1.endpoints.AI import chat_completion_events
+from services.AI.chat_bot import ChatCompletion
+from services.http.http_client import HttpClient
+
+pytestmark = pytest.mark.anyio
+
+
+def delta(content: str) -> bytes:
+    return f'data: {{"choices": [{{"delta": {{"content": "{content}"}}}}]}}\n\n'.encode()
+
+
+class MockSSEStream(httpx.AsyncByteStream):
+    """Upstream body that sends its events one at a time. Each event after the first
+    waits for `proceed`, so tests can check what was delivered before the upstream
+    finished."""
+
+    def __init__(self, events: List[bytes]):
+        self.events = events
+        self.sent = 0
+        self.proceed = asyncio.Event()
+        self.closed = False
+
+    async def __aiter__(self):
+        for event in self.events:
+            if self.sent:
+                await self.proceed.wait()
+            self.sent += 1
+            yield event
+
+    async def aclose(self):
+        self.closed = True
+
+
+def chat_completion(stream: MockSSEStream) -> ChatCompletion:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, stream=stream)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    chat = ChatCompletion(http_client=HttpClient(client=client))
+    chat.base_url = "http://upstream.test/v1"
+    return chat
+
+
+class DisconnectingRequest:
+    def __init__(self, after: int):
+        self.checks = 0
+        self.after = after
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.after
+
+
+async def test_deltas_are_yielded_as_they_arrive():
+    stream = MockSSEStream([delta("Hel"), delta("lo"), b"data: [DONE]\n\n"])
+    deltas = chat_completion(stream).stream_model_response("hi")
+
+    # Only the first event has been sent, the rest is held back by the upstream
+    assert await anext(deltas) == "Hel"
+    assert stream.sent == 1
+
+    stream.proceed.set()
+    assert [content async for content in deltas] == ["lo"]
+
+
+async def test_done_ends_the_stream():
+    stream = MockSSEStream([delta("a"), b"data: [DONE]\n\n", delta("ignored")])
+    stream.proceed.set()
+
+    assert [content async for content in chat_completion(stream).stream_model_response("hi")] == ["a"]
+    assert stream.closed
+
+
+async def test_malformed_and_keep_alive_lines_are_skipped():
+    stream = MockSSEStream([
+        delta("a"),
+        b": keep-alive\n\n",
+        b"data: \n\n",
+        b'data: {"choices": [{"delta": \n\n',
+        delta("b"),
+        b"data: [DONE]\n\n",
+    ])
+    stream.proceed.set()
+
+    assert [content async for content in chat_completion(stream).stream_model_response("hi")] == ["a", "b"]
+
+
+async def test_client_disconnect_closes_the_upstream():
+    stream = MockSSEStream([delta("a"), delta("b"), delta("c"), b"data: [DONE]\n\n"])
+    stream.proceed.set()
+    deltas = chat_completion(stream).stream_model_response("hi")
+    first = await anext(deltas)
+
+    events = [
+        event async for event in
+        chat_completion_events(DisconnectingRequest(after=1), deltas, first, start_time=0.0)
+    ]
+
+    # The first delta and one more go out, then the disconnect is noticed
+    assert len(events) == 2
+    assert all("event: message" in event for event in events)
+    assert stream.closed
+    assert stream.sent < len(stream.events)
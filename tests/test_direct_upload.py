@@ -0,0 +1,152 @@
+import os
+
+import boto3
+import httpx
+import pytest
+from fastapi import HTTPException
+from moto.server import ThreadedMotoServer
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from core.config import settings
+from db.crud.file_upload import FileUploadRepository
+from db.models import Base
+from schemas.file_schema import CompleteUploadRequest, DirectUploadRequest
+from services.aws.aws_client import AWSClient
+from services.aws.direct_upload import DirectUploadService
+from services.aws.executor import MB
+from services.aws.s3_client import AWSClientS3
+
+pytestmark = pytest.mark.anyio
+
+MOTO_PORT = 5071
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    """Presigned requests are sent over HTTP by the client, so S3 is a moto server
+    rather than an in-process mock."""
+    server = ThreadedMotoServer(port=MOTO_PORT, verbose=False)
+    server.start()
+    yield f"http://127.0.0.1:{MOTO_PORT}"
+    server.stop()
+
+
+@pytest.fixture
+def s3_client(s3_endpoint, monkeypatch):
+    monkeypatch.setenv("AWS_ENDPOINT_URL", s3_endpoint)
+    monkeypatch.setattr(settings, "DIRECT_UPLOAD_MULTIPART_THRESHOLD_MB", 6)
+    monkeypatch.setattr(settings, "DIRECT_UPLOAD_PART_SIZE_MB", 5)
+    aws_client = AWSClient("s3")
+    aws_client.get_client().create_bucket(Bucket=settings.AWS_BUCKET_NAME)
+    yield AWSClientS3(aws_client=aws_client)
+    aws_client.close()
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'uploads.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield FileUploadRepository(session)
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(s3_client, repository) -> DirectUploadService:
+    return DirectUploadService(s3_client, repository)
+
+
+def upload_parts(urls, data: bytes, part_size: int) -> list:
+    parts = []
+    for number, url in enumerate(urls, start=1):
+        response = httpx.put(url, content=data[(number - 1) * part_size:number * part_size])
+        assert response.status_code == 200
+        parts.append({"part_number": number, "etag": response.headers["ETag"]})
+    return parts
+
+
+def stored_object(key: str):
+    s3 = boto3.client("s3", region_name=settings.AWS_REGION, endpoint_url=os.environ["AWS_ENDPOINT_URL"])
+    try:
+        return s3.get_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)["Body"].read()
+    except s3.exceptions.NoSuchKey:
+        return None
+
+
+async def test_presigned_post(service):
+    data = os.urandom(1000)
+    upload = await service.create(DirectUploadRequest(file_name="a.png", content_type="image/png", size=len(data)))
+    assert upload["method"] == "post"
+
+    response = httpx.post(upload["url"], data=upload["fields"], files={"file": ("a.png", data, "image/png")})
+    assert response.status_code == 204
+
+    completed = await service.complete(upload["id"], CompleteUploadRequest())
+    assert completed["status"] == "completed"
+    assert completed["size"] == len(data)
+    assert stored_object(completed["key"]) == data
+
+    # Completing again returns the recorded upload instead of checking it a second time
+    assert (await service.complete(upload["id"], CompleteUploadRequest()))["etag"] == completed["etag"]
+
+
+async def test_multipart(service):
+    data = os.urandom(11 * MB)
+    upload = await service.create(DirectUploadRequest(file_name="v.mp4", content_type="video/mp4", size=len(data)))
+    assert upload["method"] == "multipart"
+    assert len(upload["urls"]) == 3
+
+    parts = upload_parts(upload["urls"], data, upload["part_size"])
+    completed = await service.complete(upload["id"], CompleteUploadRequest(parts=parts))
+    assert completed["status"] == "completed"
+    assert completed["size"] == len(data)
+    assert stored_object(completed["key"]) == data
+
+    assert (await service.complete(upload["id"], CompleteUploadRequest(parts=parts)))["status"] == "completed"
+
+
+async def test_multipart_needs_parts(service):
+    upload = await service.create(DirectUploadRequest(file_name="v.mp4", content_type="video/mp4", size=11 * MB))
+    with pytest.raises(HTTPException) as error:
+        await service.complete(upload["id"], CompleteUploadRequest())
+    assert error.value.status_code == 400
+
+
+async def test_oversized_declaration(service):
+    request = DirectUploadRequest(
+        file_name="big.bin", content_type="application/octet-stream", size=settings.DIRECT_UPLOAD_MAX_SIZE_MB * MB + 1,
+    )
+    with pytest.raises(HTTPException) as error:
+        await service.create(request)
+    assert error.value.status_code == 413
+
+
+async def test_oversized_upload_is_rejected(service):
+    # Part URLs cannot limit the size, a client can send more than it declared
+    declared = 7 * MB
+    upload = await service.create(DirectUploadRequest(file_name="w.mp4", content_type="video/mp4", size=declared))
+    data = os.urandom(declared + 5 * MB)
+    parts = upload_parts(upload["urls"], data, upload["part_size"] * 2)
+
+    with pytest.raises(HTTPException) as error:
+        await service.complete(upload["id"], CompleteUploadRequest(parts=parts))
+    assert error.value.status_code == 422
+
+    rejected = await service.repository.find_unique(upload["id"])
+    assert rejected.status == "rejected"
+    assert stored_object(rejected.key) is None
+
+
+async def test_missing_object(service):
+    upload = await service.create(DirectUploadRequest(file_name="a.png", content_type="image/png", size=1000))
+    with pytest.raises(HTTPException) as error:
+        await service.complete(upload["id"], CompleteUploadRequest())
+    assert error.value.status_code == 409
+    assert (await service.repository.find_unique(upload["id"])).status == "pending"
+
+
+async def test_unknown_upload(service):
+    with pytest.raises(HTTPException) as error:
+        await service.complete(12345, CompleteUploadRequest())
+    assert error.value.status_code == 404
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from db.crud.user import UserRepository
+from db.models import Base, User
+from schemas.user_schema import UserRequest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def repository():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(User(username="alice1", email="alice@example.com", is_confirmed=True))
+        await session.commit()
+        yield UserRepository(session)
+    await engine.dispose()
+
+
+def user(username: str, email: str) -> UserRequest:
+    return UserRequest(username=username, email=email, password="Secret1!")
+
+
+async def test_create_many(repository):
+    result = await repository.create_many([user("bobby1", "bob@example.com"), user("carol1", "carol@example.com")])
+    assert [row["username"] for row in result["created"]] == ["bobby1", "carol1"]
+    assert result["conflicts"] == []
+
+
+async def test_create_many_reports_conflicts(repository):
+    result = await repository.create_many([
+        user("alice1", "z@example.com"),
+        user("bobby1", "z@example.com"),
+        user("carol1", "alice@example.com"),
+    ])
+    assert [row["username"] for row in result["created"]] == ["bobby1"]
+    assert result["conflicts"] == [
+        {
+            "index": 0,
+            "email": "z@example.com",
+            "username": "alice1",
+            "detail": "User with this email and username already exists",
+        },
+        {
+            "index": 2,
+            "email": "alice@example.com",
+            "username": "carol1",
+            "detail": "User with this email already exists",
+        },
+    ]